@@ -15,6 +15,32 @@ class Settings(BaseSettings):
     
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
+    # Exchange holidays (YYYY-MM-DD) excluded from the trading calendar
+    MARKET_HOLIDAYS: List[str] = []
+    
+    # Maximum number of cached chart indicator series (LRU)
+    INDICATOR_CACHE_SIZE: int = 256
+    
+    # Maximum number of cached resampled chart series (LRU)
+    RESAMPLE_CACHE_SIZE: int = 64
+    
+    # Cached backtest price series (LRU), bounded by count and total megabytes
+    PRICE_CACHE_SIZE: int = 2048
+    PRICE_CACHE_MB: int = 512
+    
+    # Latest bars kept in memory per (symbol, exchange, interval), for at most HOT_WINDOW_BUFFERS keys (LRU)
+    HOT_WINDOW_SIZE: int = 5000
+    HOT_WINDOW_BUFFERS: int = 256
+    
+    # Build live 1-minute bars from polled quotes during market hours
+    LIVE_BARS_ENABLED: bool = False
+    LIVE_BARS_POLL_SECONDS: int = 5
+    LIVE_BARS_FLUSH_SECONDS: int = 60
+    
+    # Worker threads running queued backtests and the maximum number waiting
+    BACKTEST_WORKERS: int = 2
+    BACKTEST_QUEUE_SIZE: int = 32
+    
     class Config:
         env_file = ".env"
 
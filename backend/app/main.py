@@ -6,9 +6,12 @@ import os
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.database.database import engine, Base
-from app.routes import api, watchlist, charts, scheduler, settings as settings_router, backtest
+from app.database.database import engine, Base, SessionLocal
+from app.routes import api, watchlist, charts, scheduler, settings as settings_router, backtest, coverage
 from app.utils.scheduler import scheduler_manager
+from app.utils.hot_window import warm_hot_window
+from app.utils.backtest_queue import fail_interrupted_runs
+import logging
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +21,24 @@ async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
     
+    # Fill in-memory hot windows for watchlist symbols
+    db = SessionLocal()
+    try:
+        warm_hot_window(db)
+    except Exception as e:
+        logging.error(f"Error warming hot window: {str(e)}")
+    finally:
+        db.close()
+    
+    # Backtests queued or running when the server stopped will never finish
+    db = SessionLocal()
+    try:
+        fail_interrupted_runs(db)
+    except Exception as e:
+        logging.error(f"Error resetting interrupted backtests: {str(e)}")
+    finally:
+        db.close()
+    
     # Initialize scheduler
     scheduler_manager.init_app()
     
@@ -53,6 +74,7 @@ app.include_router(charts.router, prefix="/api/charts", tags=["charts"])
 app.include_router(scheduler.router, prefix="/api/scheduler", tags=["scheduler"])
 app.include_router(settings_router.router, prefix="/api/settings", tags=["settings"])
 app.include_router(backtest.router, prefix="/api/backtest", tags=["backtest"])
+app.include_router(coverage.router, prefix="/api/coverage", tags=["coverage"])
 
 @app.get("/")
 async def root():
@@ -6,6 +6,12 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 import json
 
+def _json_default(value):
+    # Trade and order timestamps are pandas/datetime objects
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
 class BacktestRun(Base):
     __tablename__ = "backtest_runs"
     
@@ -41,10 +47,17 @@ class BacktestRun(Base):
     
     def set_results(self, results_dict):
         if results_dict:
-            self.results = json.dumps(results_dict)
+            self.results = json.dumps(results_dict, default=_json_default)
         else:
             self.results = None
 
+class BacktestFingerprint(Base):
+    __tablename__ = "backtest_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    backtest_id = Column(Integer, nullable=False, index=True)
+    config_hash = Column(String(64), nullable=False, index=True)  # sha256 of run inputs and data version
+
 class Trade(Base):
     __tablename__ = "trades"
     
@@ -88,6 +101,14 @@ class Position(Base):
     timestamp = Column(DateTime, nullable=False)
 
 # Pydantic models
+class BacktestExecution(BaseModel):
+    order_type: str = "market"  # market, limit, stop
+    limit_offset: float = 0.0  # limit price as a fraction below (buy) / above (sell) the signal close
+    stop_offset: float = 0.0  # stop price as a fraction above (buy) / below (sell) the signal close
+    valid_bars: Optional[int] = None  # bars a limit/stop order stays working; None until filled
+    slippage: Optional[Dict[str, Any]] = None  # {"model": "none" | "bps" | "fixed", ...}
+    commission: Optional[Dict[str, Any]] = None  # {"model": "percent" | "per_share" | "flat", ...}
+
 class BacktestCreate(BaseModel):
     name: str
     strategy_name: str
@@ -97,6 +118,69 @@ class BacktestCreate(BaseModel):
     end_date: datetime
     initial_capital: float = 100000.0
     parameters: Optional[Dict[str, Any]] = {}
+    lot_method: str = "fifo"  # fifo, average
+    execution: Optional[BacktestExecution] = None  # None fills signals at the bar close
+    force: bool = False  # recompute even if an identical completed run exists
+    reuse: str = "return"  # return the identical run, or clone it under this name
+
+class BacktestPortfolioCreate(BaseModel):
+    name: str
+    strategy_name: str
+    symbols: Optional[List[str]] = None  # None runs the whole watchlist
+    exchange: str = "NSE"
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = 100000.0
+    parameters: Optional[Dict[str, Any]] = {}
+    sizing: str = "equal_weight"  # equal_weight, fixed
+    allocation: Optional[float] = None  # fraction of equity per position; default 1 / symbols
+    max_positions: Optional[int] = None
+    quantity: int = 100  # shares per position with fixed sizing
+    lot_method: str = "fifo"  # fifo, average
+    max_workers: Optional[int] = None
+    force: bool = False
+    reuse: str = "return"  # return, clone
+
+class BacktestSweepCreate(BaseModel):
+    strategy_name: str
+    symbol: str
+    exchange: str = "NSE"
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = 100000.0
+    parameters: Optional[Dict[str, Any]] = {}  # name -> [values] | {min, max, step} | value
+    sort_by: str = "sharpe_ratio"
+    top_n: Optional[int] = None
+    max_workers: Optional[int] = None
+
+class BacktestWalkForwardCreate(BaseModel):
+    strategy_name: str
+    symbol: str
+    exchange: str = "NSE"
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = 100000.0
+    parameters: Optional[Dict[str, Any]] = {}  # name -> [values] | {min, max, step} | value
+    train_days: int = 180
+    test_days: int = 30
+    sort_by: str = "sharpe_ratio"
+    max_workers: Optional[int] = None
+
+class BacktestOptimizeCreate(BaseModel):
+    strategy_name: str
+    symbol: str
+    exchange: str = "NSE"
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = 100000.0
+    parameters: Optional[Dict[str, Any]] = {}  # name -> [values] | {min, max} | value
+    budget: int = 30  # full-data backtest equivalents
+    eta: int = 3
+    min_fraction: float = 1 / 9
+    sort_by: str = "sharpe_ratio"
+    seed: Optional[int] = None
+    top_n: Optional[int] = None
+    max_workers: Optional[int] = None
 
 class BacktestResponse(BaseModel):
     id: int
@@ -112,6 +196,7 @@ class BacktestResponse(BaseModel):
     results: Optional[Dict[str, Any]]
     created_at: datetime
     completed_at: Optional[datetime]
+    reused_from: Optional[int] = None  # id of the identical completed run the results come from
     
     class Config:
         from_attributes = True
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+from pydantic import BaseModel
+from datetime import datetime, date
+from typing import Optional
+
+class DataCoverage(Base):
+    """Contiguous range of trading days stored for a symbol/exchange/interval"""
+    __tablename__ = "data_coverage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False)
+    exchange = Column(String(10), nullable=False)
+    interval = Column(String(10), nullable=False, default='D')
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('ix_coverage_symbol_exchange_interval', 'symbol', 'exchange', 'interval', 'start_date'),
+    )
+
+# Pydantic models
+class DataCoverageResponse(BaseModel):
+    symbol: str
+    exchange: str
+    interval: str
+    start_date: date
+    end_date: date
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
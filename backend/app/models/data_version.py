@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+class DataVersion(Base):
+    """Monotonic change counter per symbol/exchange/interval, bumped on every ingest"""
+    __tablename__ = "data_versions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False)
+    exchange = Column(String(10), nullable=False)
+    interval = Column(String(10), nullable=False, default='D')
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('symbol', 'exchange', 'interval', name='uix_version_symbol_exchange_interval'),
+    )
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.models.watchlist import WatchlistItem
 from app.models.stock_data import StockData
 from app.utils.data_fetcher import fetch_historical_data, fetch_realtime_quotes
+from app.utils.ingest import store_historical_data
+from app.utils.bulk_import import import_bars, detect_format, PartialImportError, DEFAULT_CHUNK_SIZE
+from app.utils.bulk_export import stream_export, validate_format, EXPORT_FORMATS
+from app.utils.ohlcv import load_ohlcv_arrays, epoch_seconds, OHLCV_FIELDS
+from app.utils.hot_window import hot_window
+from app.utils.bar_builder import bar_builder
+from app.core.config import settings
+from app.utils.downsample import downsample
+from app.utils.data_version import get_data_version
+from app.utils.conditional import make_etag, cache_headers, is_not_modified, not_modified_response
+from app.utils.wire_format import negotiate_format, columnar_response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -66,40 +78,11 @@ async def download_data(request: DownloadRequest, db: Session = Depends(get_db))
                 )
                 
                 # Store in database
-                for data_point in historical_data:
-                    # Check if exists
-                    existing = db.query(StockData).filter_by(
-                        symbol=symbol,
-                        exchange=exchange,
-                        date=data_point['date'],
-                        time=data_point['time']
-                    ).first()
-                    
-                    if existing:
-                        # Update existing
-                        existing.open = data_point['open']
-                        existing.high = data_point['high']
-                        existing.low = data_point['low']
-                        existing.close = data_point['close']
-                        existing.volume = data_point['volume']
-                    else:
-                        # Create new
-                        new_data = StockData(
-                            symbol=symbol,
-                            exchange=exchange,
-                            date=data_point['date'],
-                            time=data_point['time'],
-                            open=data_point['open'],
-                            high=data_point['high'],
-                            low=data_point['low'],
-                            close=data_point['close'],
-                            volume=data_point['volume']
-                        )
-                        db.add(new_data)
+                store_historical_data(db, symbol, exchange, request.interval, historical_data)
                 
                 db.commit()
                 results['success'].append(symbol)
-                
+            
             except Exception as e:
                 results['failed'].append({
                     'symbol': symbol,
@@ -112,10 +95,53 @@ async def download_data(request: DownloadRequest, db: Session = Depends(get_db))
             results['message'] = f"Downloaded {len(results['success'])} symbols, {len(results['failed'])} failed"
         
         return results
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/import")
+def import_data(
+    file: UploadFile = File(...),
+    symbol: Optional[str] = Form(None),
+    exchange: str = Form("NSE"),
+    interval: str = Form("D"),
+    file_format: Optional[str] = Form(None),
+    chunk_size: int = Form(DEFAULT_CHUNK_SIZE, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Bulk import OHLCV data from a CSV or Parquet file"""
+    # Sync handler so the chunked parse and upserts run in the threadpool
+    try:
+        resolved_format = detect_format(file.filename, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        results = import_bars(
+            db,
+            file.file,
+            resolved_format,
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            chunk_size=chunk_size
+        )
+        results['status'] = 'success'
+        results['message'] = f"Imported {results['rows']} rows at {results['rows_per_second']} rows/sec"
+        return results
+    
+    except PartialImportError as e:
+        db.rollback()
+        logging.error(f"Error importing {file.filename}: {str(e)}")
+        raise HTTPException(status_code=400 if isinstance(e.error, ValueError) else 500, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error importing {file.filename}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/quotes")
 async def get_quotes(symbols: str = "", exchanges: str = "", db: Session = Depends(get_db)):
     """Get real-time quotes for symbols"""
@@ -134,25 +160,104 @@ async def get_quotes(symbols: str = "", exchanges: str = "", db: Session = Depen
         
         # Fetch quotes
         quotes = fetch_realtime_quotes(symbol_list, exchange_list)
-        return quotes
         
+        # Every quote poll also advances the live 1m bars
+        if settings.LIVE_BARS_ENABLED:
+            bar_builder.update(quotes)
+        
+        return quotes
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/live-bars")
+async def get_live_bars():
+    """Get the in-progress live 1m bars built from polled quotes"""
+    return [
+        {**bar, 'minute': bar['minute'].isoformat()}
+        for bar in bar_builder.in_progress()
+    ]
+
 @router.get("/data")
 async def get_data(
+    request: Request,
+    response: Response,
     symbol: str,
     start_date: str,
     end_date: str,
     interval: str = "D",
     exchange: str = "NSE",
+    format: str = "rows",
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample_method: str = "ohlc",
     db: Session = Depends(get_db)
 ):
-    """Get OHLCV data for a specific symbol"""
+    """Get OHLCV data for a specific symbol
+    
+    format=rows returns one dict per bar; format=columnar returns parallel arrays.
+    max_points caps the number of bars returned by OHLC bucketing or LTTB.
+    Responses carry an ETag derived from the symbol's data version; a matching
+    If-None-Match is answered with 304 without reading any bars. Clients that
+    Accept Arrow IPC or MessagePack receive binary columnar payloads instead of JSON.
+    """
     try:
         start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
         
+        if format not in ('rows', 'columnar'):
+            raise ValueError(f"Unsupported format: {format}")
+        
+        wire_format = negotiate_format(request)
+        version, last_modified = get_data_version(db, symbol, exchange)
+        etag = make_etag(
+            version, symbol, exchange, interval, start_date, end_date,
+            format, max_points, downsample_method, wire_format
+        )
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        headers = cache_headers(etag, last_modified)
+        
+        if format == 'columnar' or max_points or wire_format != 'json':
+            # Both paths return the stored rows of the interval's kind (daily or intraday)
+            arrays = hot_window.read(symbol, exchange, interval, start_date_obj, end_date_obj, db)
+            if arrays is None:
+                arrays = load_ohlcv_arrays(db, symbol, exchange, start_date_obj, end_date_obj, interval)
+            arrays['time'] = epoch_seconds(arrays.pop('datetime'))
+            arrays, _ = downsample(arrays, max_points, downsample_method)
+            
+            if wire_format != 'json':
+                return columnar_response(
+                    {field: arrays[field] for field in ('time',) + OHLCV_FIELDS},
+                    wire_format,
+                    metadata={'symbol': symbol, 'exchange': exchange, 'interval': interval},
+                    headers=headers
+                )
+            
+            if format == 'columnar':
+                return JSONResponse({
+                    'symbol': symbol,
+                    'exchange': exchange,
+                    'interval': interval,
+                    'count': len(arrays['close']),
+                    'time': arrays['time'].tolist(),
+                    **{field: arrays[field].tolist() for field in OHLCV_FIELDS}
+                }, headers=headers)
+            
+            columns = [arrays[field].tolist() for field in ('time',) + OHLCV_FIELDS]
+            return JSONResponse([
+                {
+                    'time': time_value,
+                    'open': open_value,
+                    'high': high_value,
+                    'low': low_value,
+                    'close': close_value,
+                    'volume': volume_value,
+                    'symbol': symbol,
+                    'exchange': exchange,
+                    'interval': interval
+                } for time_value, open_value, high_value, low_value, close_value, volume_value in zip(*columns)
+            ], headers=headers)
+        
         data = db.query(StockData).filter(
             StockData.symbol == symbol,
             StockData.exchange == exchange,
@@ -160,6 +265,8 @@ async def get_data(
             StockData.date <= end_date_obj
         ).order_by(StockData.date, StockData.time).all()
         
+        response.headers.update(headers)
+        
         # Format for TradingView charts
         ohlcv_data = []
         for item in data:
@@ -177,6 +284,32 @@ async def get_data(
             })
         
         return ohlcv_data
-        
+    
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/export")
+async def export_data(
+    start_date: str,
+    end_date: str,
+    symbols: str = "",
+    exchange: str = "NSE",
+    format: str = "csv",
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1)
+):
+    """Stream stored OHLCV data for one or more symbols as CSV, Parquet or Arrow IPC"""
+    try:
+        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        export_format = validate_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+    filename = f"historify_{exchange}_{start_date}_{end_date}.{EXPORT_FORMATS[export_format]['extension']}"
+    
+    return StreamingResponse(
+        stream_export(symbol_list, exchange, start_date_obj, end_date_obj, export_format, chunk_size),
+        media_type=EXPORT_FORMATS[export_format]['media_type'],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
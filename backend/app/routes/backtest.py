@@ -1,15 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database.database import get_db
+from app.database.database import get_db, SessionLocal
 from app.models.backtest import (
-    BacktestRun, Trade, Order, Position,
-    BacktestCreate, BacktestResponse, TradeResponse, OrderResponse, PositionResponse
+    BacktestRun, BacktestFingerprint, Trade, Order, Position,
+    BacktestCreate, BacktestPortfolioCreate, BacktestSweepCreate, BacktestWalkForwardCreate, BacktestOptimizeCreate, BacktestResponse, TradeResponse, OrderResponse, PositionResponse
 )
 from app.models.watchlist import WatchlistItem
-from app.utils.backtest_engine import BacktestEngine
+from app.utils.backtest_engine import BacktestEngine, SIZING_MODES
+from app.utils.backtest_sweep import parameter_grid, run_sweep, rank_results, check_rank_metric
+from app.utils.backtest_walkforward import run_walk_forward
+from app.utils.backtest_portfolio import load_portfolio_data, run_portfolio_backtest, MAX_PORTFOLIO_SYMBOLS, PORTFOLIO_SYMBOL
+from app.utils.backtest_queue import backtest_queue, transition_run
+from app.utils.price_cache import price_cache
+from app.utils.position_ledger import LOT_METHODS
+from app.utils.execution import check_execution
+from app.utils.backtest_dedup import backtest_fingerprint, record_fingerprint, find_completed_run, clone_run, REUSE_MODES
+from app.utils.data_version import get_data_version, get_data_versions
+from app.utils.backtest_optimizer import successive_halving, parameter_samplers, optimizer_runs, MAX_OPTIMIZER_BUDGET
 from typing import List, Optional
 from datetime import datetime
+import numpy as np
 import logging
+import queue
+import threading
+import time
 
 router = APIRouter()
 
@@ -53,105 +67,433 @@ async def get_symbols(db: Session = Depends(get_db)):
     watchlist_items = db.query(WatchlistItem).all()
     return [{"symbol": item.symbol, "exchange": item.exchange, "name": item.name} for item in watchlist_items]
 
+def _resolved_parameters(strategy_name: str, parameters: Optional[dict]) -> dict:
+    """Strategy parameters with schema defaults filled in, so omitted and explicit defaults hash alike"""
+    defaults = {name: spec['default'] for name, spec in STRATEGIES[strategy_name]['parameters'].items()}
+    return {**defaults, **(parameters or {})}
+
+def _reuse_completed_run(db: Session, config_hash: str, name: str, reuse: str) -> Optional[BacktestResponse]:
+    """Response for an identical completed run (returned as is or cloned), or None"""
+    existing = find_completed_run(db, config_hash)
+    if existing is None:
+        return None
+    if reuse == 'clone':
+        backtest_run = clone_run(db, existing, name, config_hash)
+        db.commit()
+        db.refresh(backtest_run)
+        return _backtest_response(backtest_run, reused_from=existing.id)
+    return _backtest_response(existing, reused_from=existing.id)
+
+def _backtest_response(backtest_run: BacktestRun, reused_from: Optional[int] = None) -> BacktestResponse:
+    return BacktestResponse(
+        id=backtest_run.id,
+        name=backtest_run.name,
+        strategy_name=backtest_run.strategy_name,
+        symbol=backtest_run.symbol,
+        exchange=backtest_run.exchange,
+        start_date=backtest_run.start_date,
+        end_date=backtest_run.end_date,
+        initial_capital=backtest_run.initial_capital,
+        parameters=backtest_run.get_parameters(),
+        status=backtest_run.status,
+        results=backtest_run.get_results(),
+        created_at=backtest_run.created_at,
+        completed_at=backtest_run.completed_at,
+        reused_from=reused_from
+    )
+
 @router.post("/backtest", response_model=BacktestResponse)
 async def run_backtest(backtest_data: BacktestCreate, db: Session = Depends(get_db)):
-    """Run a backtest"""
+    """Queue a backtest and return its pending run immediately
+    
+    Poll GET /status/{id} (or /results/{id}) until the status is completed,
+    failed or cancelled. Unless ``force`` is set, an identical completed run
+    (same inputs and data version) is returned, or cloned, without recomputing.
+    """
+    if backtest_data.strategy_name not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {backtest_data.strategy_name}")
+    if backtest_data.lot_method not in LOT_METHODS:
+        raise HTTPException(status_code=400, detail=f"lot_method must be one of {', '.join(LOT_METHODS)}")
+    execution = backtest_data.execution.model_dump() if backtest_data.execution else None
+    if execution:
+        try:
+            check_execution(execution)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if backtest_data.reuse not in REUSE_MODES:
+        raise HTTPException(status_code=400, detail=f"reuse must be one of {', '.join(REUSE_MODES)}")
+    
+    config = {
+        'strategy_name': backtest_data.strategy_name,
+        'symbol': backtest_data.symbol,
+        'exchange': backtest_data.exchange,
+        'start_date': backtest_data.start_date,
+        'end_date': backtest_data.end_date,
+        'initial_capital': backtest_data.initial_capital,
+        'parameters': backtest_data.parameters or {},
+        'lot_method': backtest_data.lot_method,
+        'execution': execution
+    }
+    config_hash = backtest_fingerprint(
+        {**config, 'parameters': _resolved_parameters(backtest_data.strategy_name, backtest_data.parameters)},
+        get_data_version(db, backtest_data.symbol, backtest_data.exchange)[0]
+    )
+    if not backtest_data.force:
+        reused = _reuse_completed_run(db, config_hash, backtest_data.name, backtest_data.reuse)
+        if reused:
+            return reused
+    
+    # Create backtest record
+    backtest_run = BacktestRun(
+        name=backtest_data.name,
+        strategy_name=backtest_data.strategy_name,
+        symbol=backtest_data.symbol,
+        exchange=backtest_data.exchange,
+        start_date=backtest_data.start_date,
+        end_date=backtest_data.end_date,
+        initial_capital=backtest_data.initial_capital,
+        status='pending'
+    )
+    backtest_run.set_parameters(backtest_data.parameters)
+    
+    db.add(backtest_run)
+    db.commit()
+    db.refresh(backtest_run)
+    
     try:
-        # Create backtest record
-        backtest_run = BacktestRun(
-            name=backtest_data.name,
-            strategy_name=backtest_data.strategy_name,
-            symbol=backtest_data.symbol,
-            exchange=backtest_data.exchange,
-            start_date=backtest_data.start_date,
-            end_date=backtest_data.end_date,
-            initial_capital=backtest_data.initial_capital,
-            status='running'
-        )
-        backtest_run.set_parameters(backtest_data.parameters)
-        
-        db.add(backtest_run)
+        backtest_queue.submit(backtest_run.id, config)
+    except queue.Full:
+        db.delete(backtest_run)
         db.commit()
-        db.refresh(backtest_run)
-        
-        # Run backtest
-        engine = BacktestEngine(db)
-        config = {
-            'strategy_name': backtest_data.strategy_name,
-            'symbol': backtest_data.symbol,
-            'exchange': backtest_data.exchange,
-            'start_date': backtest_data.start_date,
-            'end_date': backtest_data.end_date,
-            'initial_capital': backtest_data.initial_capital,
-            'parameters': backtest_data.parameters or {}
-        }
-        
-        results = engine.run_backtest(config)
+        raise HTTPException(status_code=503, detail="Backtest queue is full, try again later")
+    
+    record_fingerprint(db, backtest_run.id, config_hash)
+    db.commit()
+    return _backtest_response(backtest_run)
+
+@router.get("/status/{backtest_id}")
+async def get_backtest_status(backtest_id: int, db: Session = Depends(get_db)):
+    """Status of a backtest run, with stage and progress while queued or running"""
+    backtest = db.query(BacktestRun).filter(BacktestRun.id == backtest_id).first()
+    if not backtest:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    
+    progress = backtest_queue.progress(backtest_id)
+    if progress is None:
+        progress = {'stage': backtest.status, 'progress': 1.0 if backtest.status == 'completed' else 0.0}
+    return {
+        'id': backtest.id,
+        'status': backtest.status,
+        **progress,
+        'error': backtest.get_results().get('error') if backtest.status == 'failed' else None,
+        'created_at': backtest.created_at,
+        'completed_at': backtest.completed_at
+    }
+
+@router.post("/cancel/{backtest_id}")
+async def cancel_backtest(backtest_id: int, db: Session = Depends(get_db)):
+    """Cancel a pending or running backtest"""
+    backtest = db.query(BacktestRun).filter(BacktestRun.id == backtest_id).first()
+    if not backtest:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    if backtest.status not in ('pending', 'running'):
+        raise HTTPException(status_code=400, detail=f"Backtest is already {backtest.status}")
+    
+    backtest_queue.cancel(backtest_id)
+    # Conditional, so a run a worker has claimed meanwhile is not overwritten
+    if transition_run(db, backtest_id, 'pending', 'cancelled', completed_at=datetime.now()):
+        db.commit()
+        return {'id': backtest_id, 'status': 'cancelled'}
+    db.rollback()
+    db.refresh(backtest)
+    if backtest.status != 'running':
+        raise HTTPException(status_code=400, detail=f"Backtest is already {backtest.status}")
+    return {'id': backtest_id, 'status': 'cancelling'}
+
+@router.get("/queue")
+async def get_queue_stats():
+    """Backtest worker pool and queue usage"""
+    return backtest_queue.stats()
+
+@router.get("/cache")
+async def get_price_cache_stats():
+    """Usage of the shared backtest price-data cache"""
+    return price_cache.stats()
+
+@router.post("/portfolio", response_model=BacktestResponse)
+def run_portfolio(portfolio_data: BacktestPortfolioCreate, db: Session = Depends(get_db)):
+    """Backtest a strategy over a list of symbols (or the whole watchlist) with shared capital
+    
+    Signals are generated per symbol in parallel and all fills are merged on one
+    timeline against a single cash balance. An identical completed run is reused
+    unless ``force`` is set, as for /backtest.
+    """
+    if portfolio_data.strategy_name not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {portfolio_data.strategy_name}")
+    if portfolio_data.lot_method not in LOT_METHODS:
+        raise HTTPException(status_code=400, detail=f"lot_method must be one of {', '.join(LOT_METHODS)}")
+    if portfolio_data.reuse not in REUSE_MODES:
+        raise HTTPException(status_code=400, detail=f"reuse must be one of {', '.join(REUSE_MODES)}")
+    # Checked before the run row is created, so a bad request leaves nothing behind
+    if portfolio_data.sizing not in SIZING_MODES:
+        raise HTTPException(status_code=400, detail=f"sizing must be one of {', '.join(SIZING_MODES)}")
+    if portfolio_data.allocation is not None and not 0 < portfolio_data.allocation <= 1:
+        raise HTTPException(status_code=400, detail="allocation must be in (0, 1]")
+    if portfolio_data.max_positions is not None and portfolio_data.max_positions < 1:
+        raise HTTPException(status_code=400, detail="max_positions must be at least 1")
+    if portfolio_data.quantity < 1:
+        raise HTTPException(status_code=400, detail="quantity must be at least 1")
+    
+    if portfolio_data.symbols:
+        instruments = [(symbol, portfolio_data.exchange) for symbol in dict.fromkeys(portfolio_data.symbols)]
+    else:
+        instruments = [(item.symbol, item.exchange) for item in db.query(WatchlistItem).all()]
+    if not instruments:
+        raise HTTPException(status_code=400, detail="No symbols given and the watchlist is empty")
+    if len(instruments) > MAX_PORTFOLIO_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PORTFOLIO_SYMBOLS} symbols per portfolio backtest")
+    
+    exchanges = {exchange for _, exchange in instruments}
+    data_versions = {}
+    for exchange in exchanges:
+        versions = get_data_versions(db, [symbol for symbol, symbol_exchange in instruments if symbol_exchange == exchange], exchange)
+        data_versions.update({f"{symbol}:{exchange}": version for symbol, version in versions.items()})
+    config_hash = backtest_fingerprint(
+        {
+            'strategy_name': portfolio_data.strategy_name,
+            'instruments': instruments,
+            'start_date': portfolio_data.start_date,
+            'end_date': portfolio_data.end_date,
+            'initial_capital': portfolio_data.initial_capital,
+            'parameters': _resolved_parameters(portfolio_data.strategy_name, portfolio_data.parameters),
+            'sizing': portfolio_data.sizing,
+            'allocation': portfolio_data.allocation,
+            'max_positions': portfolio_data.max_positions,
+            'quantity': portfolio_data.quantity,
+            'lot_method': portfolio_data.lot_method
+        },
+        data_versions
+    )
+    if not portfolio_data.force:
+        reused = _reuse_completed_run(db, config_hash, portfolio_data.name, portfolio_data.reuse)
+        if reused:
+            return reused
+    
+    backtest_run = BacktestRun(
+        name=portfolio_data.name,
+        strategy_name=portfolio_data.strategy_name,
+        symbol=instruments[0][0] if len(instruments) == 1 else PORTFOLIO_SYMBOL,
+        exchange=exchanges.pop() if len(exchanges) == 1 else 'MULTI',
+        start_date=portfolio_data.start_date,
+        end_date=portfolio_data.end_date,
+        initial_capital=portfolio_data.initial_capital,
+        status='running'
+    )
+    backtest_run.set_parameters(portfolio_data.parameters)
+    db.add(backtest_run)
+    db.flush()
+    record_fingerprint(db, backtest_run.id, config_hash)
+    db.commit()
+    db.refresh(backtest_run)
+    
+    try:
+        started = time.perf_counter()
+        series = load_portfolio_data(db, instruments, portfolio_data.start_date, portfolio_data.end_date)
+        results = run_portfolio_backtest(
+            series,
+            portfolio_data.strategy_name,
+            portfolio_data.parameters or {},
+            portfolio_data.initial_capital,
+            sizing=portfolio_data.sizing,
+            allocation=portfolio_data.allocation,
+            max_positions=portfolio_data.max_positions,
+            quantity=portfolio_data.quantity,
+            max_workers=portfolio_data.max_workers,
+            lot_method=portfolio_data.lot_method
+        )
+        results['elapsed_seconds'] = round(time.perf_counter() - started, 3)
         
-        # Update backtest record with results
         backtest_run.status = 'completed'
         backtest_run.completed_at = datetime.now()
         backtest_run.set_results(results)
-        
-        # Save trades
-        for trade_data in results.get('trades', []):
-            trade = Trade(
-                backtest_id=backtest_run.id,
-                symbol=backtest_data.symbol,
-                side=trade_data['side'],
-                quantity=trade_data['quantity'],
-                price=trade_data['price'],
-                timestamp=datetime.fromisoformat(trade_data['timestamp'].replace('Z', '+00:00')) if isinstance(trade_data['timestamp'], str) else trade_data['timestamp'],
-                order_id=trade_data.get('order_id'),
-                commission=trade_data.get('commission', 0),
-                pnl=trade_data.get('pnl', 0)
-            )
-            db.add(trade)
-        
-        # Save orders
-        for order_data in results.get('orders', []):
-            order = Order(
-                backtest_id=backtest_run.id,
-                order_id=order_data['order_id'],
-                symbol=backtest_data.symbol,
-                side=order_data['side'],
-                order_type=order_data['order_type'],
-                quantity=order_data['quantity'],
-                price=order_data.get('price'),
-                status=order_data['status'],
-                timestamp=datetime.fromisoformat(order_data['timestamp'].replace('Z', '+00:00')) if isinstance(order_data['timestamp'], str) else order_data['timestamp'],
-                filled_quantity=order_data.get('filled_quantity', 0),
-                filled_price=order_data.get('filled_price')
-            )
-            db.add(order)
-        
+        BacktestEngine(db).save_results(backtest_run, results)
         db.commit()
         db.refresh(backtest_run)
         
-        return BacktestResponse(
-            id=backtest_run.id,
-            name=backtest_run.name,
-            strategy_name=backtest_run.strategy_name,
-            symbol=backtest_run.symbol,
-            exchange=backtest_run.exchange,
-            start_date=backtest_run.start_date,
-            end_date=backtest_run.end_date,
-            initial_capital=backtest_run.initial_capital,
-            parameters=backtest_run.get_parameters(),
-            status=backtest_run.status,
-            results=backtest_run.get_results(),
-            created_at=backtest_run.created_at,
-            completed_at=backtest_run.completed_at
+        return _backtest_response(backtest_run)
+    
+    except Exception as e:
+        db.rollback()
+        backtest_run.status = 'failed'
+        db.commit()
+        
+        logging.error(f"Portfolio backtest error: {str(e)}")
+        status_code = 400 if isinstance(e, ValueError) else 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+
+@router.post("/sweep")
+def run_parameter_sweep(sweep_data: BacktestSweepCreate, db: Session = Depends(get_db)):
+    """Run a strategy over a grid of parameters and rank the results
+    
+    Ranges come from the request within the STRATEGIES schema bounds. Price data
+    is loaded once and shared with a pool of worker processes.
+    """
+    if sweep_data.strategy_name not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {sweep_data.strategy_name}")
+    
+    try:
+        grid = parameter_grid(
+            sweep_data.strategy_name,
+            STRATEGIES[sweep_data.strategy_name]['parameters'],
+            sweep_data.parameters
+        )
+        check_rank_metric(sweep_data.sort_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    started = time.perf_counter()
+    data = BacktestEngine(db)._get_historical_data(
+        sweep_data.symbol, sweep_data.exchange, sweep_data.start_date, sweep_data.end_date
+    )
+    if data.empty:
+        raise HTTPException(status_code=404, detail="No historical data found for the given parameters")
+    
+    results = rank_results(
+        run_sweep(data, sweep_data.strategy_name, grid, sweep_data.initial_capital, sweep_data.max_workers),
+        sweep_data.sort_by
+    )
+    
+    return {
+        'strategy_name': sweep_data.strategy_name,
+        'symbol': sweep_data.symbol,
+        'exchange': sweep_data.exchange,
+        'bars': len(data),
+        'combinations': len(grid),
+        'sort_by': sweep_data.sort_by,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+        'results': results[:sweep_data.top_n] if sweep_data.top_n else results
+    }
+
+@router.post("/walk-forward")
+def run_walk_forward_backtest(wf_data: BacktestWalkForwardCreate, db: Session = Depends(get_db)):
+    """Walk-forward optimization: optimize on rolling train windows, test on the next period
+    
+    Every train window is grid-searched over the requested ranges and the best
+    parameters are run on the test period that follows. Windows run in parallel;
+    the response has per-window stats and the stitched out-of-sample equity.
+    """
+    if wf_data.strategy_name not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {wf_data.strategy_name}")
+    
+    try:
+        grid = parameter_grid(
+            wf_data.strategy_name,
+            STRATEGIES[wf_data.strategy_name]['parameters'],
+            wf_data.parameters
+        )
+        check_rank_metric(wf_data.sort_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    started = time.perf_counter()
+    data = BacktestEngine(db)._get_historical_data(
+        wf_data.symbol, wf_data.exchange, wf_data.start_date, wf_data.end_date
+    )
+    if data.empty:
+        raise HTTPException(status_code=404, detail="No historical data found for the given parameters")
+    
+    try:
+        result = run_walk_forward(
+            data,
+            wf_data.strategy_name,
+            grid,
+            wf_data.initial_capital,
+            wf_data.train_days,
+            wf_data.test_days,
+            wf_data.sort_by,
+            wf_data.max_workers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        'strategy_name': wf_data.strategy_name,
+        'symbol': wf_data.symbol,
+        'exchange': wf_data.exchange,
+        'bars': len(data),
+        'combinations': len(grid),
+        'sort_by': wf_data.sort_by,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+        **result
+    }
+
+def _run_optimizer(run_id: str, optimize_data: BacktestOptimizeCreate, seed: int):
+    """Load data and run successive halving, recording progress in the registry"""
+    db = SessionLocal()
+    try:
+        optimizer_runs.update(run_id, status='running')
+        data = BacktestEngine(db)._get_historical_data(
+            optimize_data.symbol, optimize_data.exchange, optimize_data.start_date, optimize_data.end_date
         )
+        if data.empty:
+            raise ValueError("No historical data found for the given parameters")
         
+        result = successive_halving(
+            data,
+            optimize_data.strategy_name,
+            STRATEGIES[optimize_data.strategy_name]['parameters'],
+            optimize_data.parameters,
+            optimize_data.initial_capital,
+            budget=optimize_data.budget,
+            eta=optimize_data.eta,
+            min_fraction=optimize_data.min_fraction,
+            sort_by=optimize_data.sort_by,
+            seed=seed,
+            max_workers=optimize_data.max_workers,
+            progress=lambda state: optimizer_runs.update(run_id, progress=state)
+        )
+        if optimize_data.top_n:
+            result['results'] = result['results'][:optimize_data.top_n]
+        optimizer_runs.update(run_id, status='completed', result=result)
+    
     except Exception as e:
-        # Update status to failed
-        if 'backtest_run' in locals():
-            backtest_run.status = 'failed'
-            db.commit()
-        
-        logging.error(f"Backtest error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logging.error(f"Optimizer error: {str(e)}")
+        optimizer_runs.update(run_id, status='failed', error=str(e))
+    finally:
+        db.close()
+
+@router.post("/optimize")
+async def start_optimizer(optimize_data: BacktestOptimizeCreate):
+    """Start a random search + successive halving optimization in the background
+    
+    Returns the run id and seed immediately; poll GET /optimize/{id} for progress
+    and results. Re-running with the same seed reproduces the results.
+    """
+    if optimize_data.strategy_name not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {optimize_data.strategy_name}")
+    if not 1 <= optimize_data.budget <= MAX_OPTIMIZER_BUDGET:
+        raise HTTPException(status_code=400, detail=f"Budget must be between 1 and {MAX_OPTIMIZER_BUDGET}")
+    try:
+        check_rank_metric(optimize_data.sort_by)
+        parameter_samplers(
+            optimize_data.strategy_name, STRATEGIES[optimize_data.strategy_name]['parameters'], optimize_data.parameters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    seed = optimize_data.seed if optimize_data.seed is not None else int(np.random.SeedSequence().entropy % 2 ** 32)
+    run_id = optimizer_runs.create({**optimize_data.model_dump(mode='json'), 'seed': seed})
+    threading.Thread(target=_run_optimizer, args=(run_id, optimize_data, seed), daemon=True).start()
+    
+    return {'id': run_id, 'status': 'pending', 'seed': seed}
+
+@router.get("/optimize/{run_id}")
+async def get_optimizer_run(run_id: str):
+    """Get progress and results of an optimizer run"""
+    run = optimizer_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Optimizer run not found")
+    return run
 
 @router.get("/results", response_model=List[BacktestResponse])
 async def get_backtest_results(
@@ -228,10 +570,13 @@ async def delete_backtest(backtest_id: int, db: Session = Depends(get_db)):
     if not backtest:
         raise HTTPException(status_code=404, detail="Backtest not found")
     
+    backtest_queue.cancel(backtest_id)
+    
     # Delete related data
     db.query(Trade).filter(Trade.backtest_id == backtest_id).delete()
     db.query(Order).filter(Order.backtest_id == backtest_id).delete()
     db.query(Position).filter(Position.backtest_id == backtest_id).delete()
+    db.query(BacktestFingerprint).filter(BacktestFingerprint.backtest_id == backtest_id).delete()
     
     # Delete backtest
     db.delete(backtest)
@@ -1,73 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.database.database import get_db
-from app.models.stock_data import StockData
+from app.utils.ohlcv import epoch_seconds, load_ohlcv_before, load_ohlcv_multi, OHLCV_FIELDS
+from app.utils.resample import load_resampled_bars, load_resampled_page, resample_bars
+from app.utils.compare import align_series, normalize_to
+from app.utils.indicators import calculate_ema, calculate_rsi
+from app.utils.market_calendar import IST
+from app.utils.downsample import downsample
+from app.utils.indicator_cache import indicator_cache
+from app.utils.indicator_engine import (
+    INDICATORS, compute_indicators, parse_indicator_specs, describe_indicators, warmup_bars
+)
+from app.utils.data_version import get_data_version
+from app.utils.conditional import make_etag, cache_headers, is_not_modified, not_modified_response
+from app.utils.wire_format import negotiate_format, columnar_response
 from datetime import datetime, timedelta
-import pandas as pd
+from typing import Optional
 import numpy as np
-import pytz
 
 router = APIRouter()
 
-def calculate_ema(data, period=20):
-    """Calculate Exponential Moving Average"""
-    if len(data) < period:
-        return [None] * len(data)
-    
-    df = pd.DataFrame(data)
-    df['ema'] = df['close'].ewm(span=period, adjust=False).mean()
-    return df['ema'].tolist()
+# Largest chart time cursor (Unix seconds) that still converts to an IST datetime
+MAX_CURSOR = 253402214399
 
-def calculate_rsi(data, period=14):
-    """Calculate Relative Strength Index"""
-    if len(data) < period + 1:
-        return [None] * len(data)
-    
-    df = pd.DataFrame(data)
-    delta = df['close'].diff()
-    
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    
-    avg_gain = gain.rolling(window=period).mean().fillna(0)
-    avg_loss = loss.rolling(window=period).mean().fillna(0)
-    
-    rs = avg_gain / avg_loss.replace(0, np.finfo(float).eps)
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi.tolist()
+def _series_points(times, values):
+    """Build [{time, value}] points, skipping undefined (NaN) values"""
+    defined = ~np.isnan(values)
+    return [
+        {'time': time_value, 'value': value}
+        for time_value, value in zip(times[defined].tolist(), values[defined].tolist())
+    ]
+
+def _chart_window(interval):
+    """Get the default date range for an interval"""
+    end_date = datetime.now().date()
+    if interval in ['1m', '5m', '15m', '30m']:
+        start_date = end_date - timedelta(days=7)
+    elif interval == '1h':
+        start_date = end_date - timedelta(days=30)
+    elif interval == 'D':
+        start_date = end_date - timedelta(days=365)
+    elif interval == 'W':
+        start_date = end_date - timedelta(days=365 * 5)
+    else:
+        start_date = end_date - timedelta(days=30)
+    return start_date, end_date
+
+def _cursor_datetime(before):
+    """Convert a chart time cursor (Unix seconds) back to a naive IST datetime"""
+    return datetime.fromtimestamp(before, IST).replace(tzinfo=None)
+
+def _older_cursor(db, symbol, exchange, arrays, times):
+    """next_before for a full-window response, or None when nothing older is stored"""
+    older = load_ohlcv_before(db, symbol, exchange, arrays['datetime'][0].astype(object), 1)
+    return int(times[0]) if len(older['datetime']) else None
+
+def _drop_warmup(columns, limit):
+    """Slice aligned columns down to their newest ``limit`` bars"""
+    start = max(len(columns['time']) - limit, 0)
+    return {key: values[start:] for key, values in columns.items()}, start
+
+def _candlestick_points(columns):
+    """Build [{time, open, high, low, close, volume}] candles from columns"""
+    return [
+        {
+            'time': time_value,
+            'open': open_value,
+            'high': high_value,
+            'low': low_value,
+            'close': close_value,
+            'volume': volume_value
+        } for time_value, open_value, high_value, low_value, close_value, volume_value in zip(
+            columns['time'].tolist(), columns['open'].tolist(), columns['high'].tolist(),
+            columns['low'].tolist(), columns['close'].tolist(), columns['volume'].tolist()
+        )
+    ]
 
 @router.get("/chart-data/{symbol}/{exchange}/{interval}/{ema_period}/{rsi_period}")
 async def get_chart_data(
+    request: Request,
+    response: Response,
     symbol: str,
     exchange: str,
     interval: str,
     ema_period: int = 20,
     rsi_period: int = 14,
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample_method: str = "ohlc",
+    before: Optional[int] = Query(None, ge=0, le=MAX_CURSOR),
+    limit: int = Query(500, ge=1, le=5000),
     db: Session = Depends(get_db)
 ):
-    """Get chart data with indicators for TradingView chart"""
+    """Get chart data with indicators for TradingView chart
+    
+    Stored bars are resampled to the interval with buckets anchored at the IST
+    session open. max_points caps the number of candles returned by OHLC bucketing or LTTB;
+    indicators are computed on the full series before reduction. Responses carry
+    an ETag derived from the symbol's data version for conditional requests, and
+    Accept: Arrow IPC / MessagePack returns aligned binary columns instead of JSON.
+    
+    Passing before (the next_before cursor, Unix seconds) returns only the limit
+    bars older than it; indicators are computed over extra warm-up bars so they
+    stay continuous with the page already on screen.
+    """
     try:
-        # Get date range based on interval
-        end_date = datetime.now().date()
-        if interval in ['1m', '5m', '15m', '30m']:
-            start_date = end_date - timedelta(days=7)
-        elif interval == '1h':
-            start_date = end_date - timedelta(days=30)
-        elif interval == 'D':
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=30)
+        start_date, end_date = _chart_window(interval)
         
-        # Fetch data from database
-        data = db.query(StockData).filter(
-            StockData.symbol == symbol,
-            StockData.exchange == exchange,
-            StockData.date >= start_date,
-            StockData.date <= end_date
-        ).order_by(StockData.date, StockData.time).all()
+        wire_format = negotiate_format(request)
+        version, last_modified = get_data_version(db, symbol, exchange)
+        etag = make_etag(
+            version, symbol, exchange, interval, ema_period, rsi_period,
+            start_date, end_date, max_points, downsample_method, wire_format, before, limit
+        )
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        headers = cache_headers(etag, last_modified)
+        response.headers.update(headers)
         
-        if not data:
+        # Load stored bars as columns and resample them to the requested interval
+        if before is None:
+            arrays = load_resampled_bars(db, symbol, exchange, interval, start_date, end_date, version)
+        else:
+            warmup = 3 * max(ema_period, rsi_period + 1)
+            arrays, has_more = load_resampled_page(
+                db, symbol, exchange, interval, _cursor_datetime(before), limit + warmup
+            )
+            if len(arrays['close']) == 0:
+                return JSONResponse(
+                    {'candlestick': [], 'ema': [], 'rsi': [], 'next_before': None}, headers=headers
+                )
+        
+        if len(arrays['close']) == 0:
             return {
                 'error': f'No data found for {symbol} ({exchange}) with {interval} interval',
                 'candlestick': [],
@@ -75,64 +139,59 @@ async def get_chart_data(
                 'rsi': []
             }
         
-        # Convert to OHLCV format
-        ohlcv_data = []
-        for item in data:
-            try:
-                if item.time is None:
-                    if interval in ['D', '1d']:
-                        time_obj = item.date.strftime('%Y-%m-%d')
-                    else:
-                        db_datetime_naive = datetime.combine(item.date, datetime.min.time())
-                        ist_tz = pytz.timezone('Asia/Kolkata')
-                        ist_datetime_aware = ist_tz.localize(db_datetime_naive)
-                        time_obj = int(ist_datetime_aware.timestamp())
-                else:
-                    db_datetime_naive = datetime.combine(item.date, item.time)
-                    ist_tz = pytz.timezone('Asia/Kolkata')
-                    ist_datetime_aware = ist_tz.localize(db_datetime_naive)
-                    time_obj = int(ist_datetime_aware.timestamp())
-                
-            except Exception as e:
-                time_obj = int(datetime.now().timestamp())
-            
-            ohlcv_data.append({
-                'time': time_obj,
-                'open': item.open,
-                'high': item.high,
-                'low': item.low,
-                'close': item.close,
-                'volume': item.volume
-            })
+        # Stored bars are IST wall-clock times
+        columns = {'time': epoch_seconds(arrays['datetime'], IST)}
+        for field in OHLCV_FIELDS:
+            columns[field] = arrays[field]
         
-        # Sort by time
-        ohlcv_data = sorted(ohlcv_data, key=lambda x: x['time'])
+        if before is None:
+            # Calculate indicators, extending cached series where only recent bars changed
+            ema_values = indicator_cache.get(
+                symbol, exchange, interval, 'ema', ema_period, columns['time'], arrays['close'], version
+            )
+            rsi_values = indicator_cache.get(
+                symbol, exchange, interval, 'rsi', rsi_period, columns['time'], arrays['close'], version
+            )
+            next_before = _older_cursor(db, symbol, exchange, arrays, columns['time'])
+        else:
+            # Run indicators over the warm-up bars, then return only the page
+            columns['ema'] = calculate_ema(arrays['close'], ema_period)
+            columns['rsi'] = calculate_rsi(arrays['close'], rsi_period)
+            columns, dropped = _drop_warmup(columns, limit)
+            ema_values = columns.pop('ema')
+            rsi_values = columns.pop('rsi')
+            next_before = int(columns['time'][0]) if has_more or dropped else None
         
-        # Calculate indicators
-        ema_data = []
-        ema_values = calculate_ema(ohlcv_data, ema_period)
-        for i, item in enumerate(ohlcv_data):
-            if i < len(ema_values) and ema_values[i] is not None:
-                ema_data.append({
-                    'time': item['time'],
-                    'value': ema_values[i]
-                })
+        # Reduce candles and indicators to the point budget
+        columns, indices = downsample(columns, max_points, downsample_method)
+        ema_values = ema_values[indices]
+        rsi_values = rsi_values[indices]
         
-        rsi_data = []
-        rsi_values = calculate_rsi(ohlcv_data, rsi_period)
-        for i, item in enumerate(ohlcv_data):
-            if i < len(rsi_values) and rsi_values[i] is not None:
-                rsi_data.append({
-                    'time': item['time'],
-                    'value': rsi_values[i]
-                })
-        
-        return {
-            'candlestick': ohlcv_data,
-            'ema': ema_data,
-            'rsi': rsi_data
-        }
+        if wire_format != 'json':
+            columns['ema'] = ema_values
+            columns['rsi'] = rsi_values
+            return columnar_response(
+                columns,
+                wire_format,
+                metadata={
+                    'symbol': symbol,
+                    'exchange': exchange,
+                    'interval': interval,
+                    'ema_period': ema_period,
+                    'rsi_period': rsi_period,
+                    'next_before': next_before
+                },
+                headers=headers
+            )
         
+        times = columns['time']
+        return JSONResponse({
+            'candlestick': _candlestick_points(columns),
+            'ema': _series_points(times, ema_values),
+            'rsi': _series_points(times, rsi_values),
+            'next_before': next_before
+        }, headers=headers)
+    
     except Exception as e:
         return {
             'error': f"Error processing chart data: {str(e)}",
@@ -141,6 +200,204 @@ async def get_chart_data(
             'rsi': []
         }
 
+@router.get("/indicators")
+async def get_indicators():
+    """Get available chart indicators with their parameters and outputs"""
+    return describe_indicators()
+
+@router.get("/chart-data/{symbol}/{exchange}/{interval}")
+async def get_chart_indicators(
+    request: Request,
+    response: Response,
+    symbol: str,
+    exchange: str,
+    interval: str,
+    indicators: str = "ema:20,rsi:14",
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample_method: str = "ohlc",
+    before: Optional[int] = Query(None, ge=0, le=MAX_CURSOR),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Get chart data with any set of registered indicators
+    
+    indicators is a comma-separated list of name[:param...] specs, e.g.
+    "ema:50,macd:12:26:9,bollinger:20:2,vwap". All indicators are computed in
+    one pass over the series, sharing intermediates such as moving averages and ATR.
+    before/limit page backwards through history as on the fixed-period chart route.
+    """
+    try:
+        specs = parse_indicator_specs(indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    start_date, end_date = _chart_window(interval)
+    
+    wire_format = negotiate_format(request)
+    version, last_modified = get_data_version(db, symbol, exchange)
+    etag = make_etag(
+        version, symbol, exchange, interval, specs,
+        start_date, end_date, max_points, downsample_method, wire_format, before, limit
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    headers = cache_headers(etag, last_modified)
+    response.headers.update(headers)
+    
+    if before is None:
+        arrays = load_resampled_bars(db, symbol, exchange, interval, start_date, end_date, version)
+    else:
+        arrays, has_more = load_resampled_page(
+            db, symbol, exchange, interval, _cursor_datetime(before), limit + warmup_bars(specs)
+        )
+        if len(arrays['close']) == 0:
+            return JSONResponse({'candlestick': [], 'indicators': {}, 'next_before': None}, headers=headers)
+    
+    if len(arrays['close']) == 0:
+        return {
+            'error': f'No data found for {symbol} ({exchange}) with {interval} interval',
+            'candlestick': [],
+            'indicators': {}
+        }
+    
+    columns = {'time': epoch_seconds(arrays['datetime'], IST)}
+    for field in OHLCV_FIELDS:
+        columns[field] = arrays[field]
+    
+    results = compute_indicators(columns, specs, arrays['datetime'])
+    
+    if before is None:
+        next_before = _older_cursor(db, symbol, exchange, arrays, columns['time'])
+    else:
+        # Indicators have run over the warm-up bars; keep only the page
+        columns, start = _drop_warmup(columns, limit)
+        results = {
+            indicator_id: {output: values[start:] for output, values in outputs.items()}
+            for indicator_id, outputs in results.items()
+        }
+        next_before = int(columns['time'][0]) if has_more or start else None
+    
+    columns, indices = downsample(columns, max_points, downsample_method)
+    results = {
+        indicator_id: {output: values[indices] for output, values in outputs.items()}
+        for indicator_id, outputs in results.items()
+    }
+    
+    if wire_format != 'json':
+        for indicator_id, outputs in results.items():
+            for output, values in outputs.items():
+                columns[f'{indicator_id}.{output}'] = values
+        return columnar_response(
+            columns,
+            wire_format,
+            metadata={
+                'symbol': symbol,
+                'exchange': exchange,
+                'interval': interval,
+                'indicators': indicators,
+                'next_before': next_before
+            },
+            headers=headers
+        )
+    
+    times = columns['time']
+    return JSONResponse({
+        'candlestick': _candlestick_points(columns),
+        'indicators': {
+            indicator_id: {
+                'name': name,
+                'params': params,
+                'pane': INDICATORS[name]['pane'],
+                'series': {
+                    output: _series_points(times, values)
+                    for output, values in results[indicator_id].items()
+                }
+            } for indicator_id, name, params in specs
+        },
+        'next_before': next_before
+    }, headers=headers)
+
+MAX_COMPARE_SYMBOLS = 50
+
+@router.get("/compare")
+async def compare_symbols(
+    request: Request,
+    symbols: str,
+    exchange: str = "NSE",
+    interval: str = "D",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    fields: str = "close",
+    normalize: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Compare several symbols on one common time index
+    
+    All symbols are read with a single IN-filtered range query, resampled to the
+    interval and aligned on the union of their bar times (null where a symbol has
+    no bar). normalize=YYYY-MM-DD rebases prices so each symbol's first close on
+    or after that date is 100. Columns are named "SYMBOL.field".
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
+    field_list = [f.strip().lower() for f in fields.split(',') if f.strip()]
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbol_list) > MAX_COMPARE_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_SYMBOLS} symbols can be compared")
+    unknown = [f for f in field_list if f not in OHLCV_FIELDS]
+    if unknown or not field_list:
+        raise HTTPException(status_code=400, detail=f"Unsupported fields: {', '.join(unknown) or fields}")
+    
+    try:
+        default_start, default_end = _chart_window(interval)
+        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else default_start
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else default_end
+        base_date = datetime.strptime(normalize, '%Y-%m-%d') if normalize else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if base_date is not None and 'close' not in field_list:
+        field_list.append('close')
+    
+    series = load_ohlcv_multi(db, symbol_list, exchange, start_date_obj, end_date_obj)
+    series = {symbol: resample_bars(arrays, interval) for symbol, arrays in series.items()}
+    missing = [symbol for symbol, arrays in series.items() if len(arrays['datetime']) == 0]
+    
+    datetimes, aligned = align_series(series, field_list)
+    if base_date is not None:
+        aligned = normalize_to(datetimes, aligned, base_date)
+    times = epoch_seconds(datetimes, IST)
+    
+    wire_format = negotiate_format(request)
+    if wire_format != 'json':
+        columns = {'time': times}
+        for symbol, symbol_fields in aligned.items():
+            for field, values in symbol_fields.items():
+                columns[f'{symbol}.{field}'] = values
+        return columnar_response(
+            columns,
+            wire_format,
+            metadata={
+                'symbols': symbol_list,
+                'exchange': exchange,
+                'interval': interval,
+                'normalize': normalize,
+                'missing': missing
+            }
+        )
+    
+    return JSONResponse({
+        'time': times.tolist(),
+        'series': {
+            symbol: {
+                field: [None if value != value else value for value in values.tolist()]
+                for field, values in symbol_fields.items()
+            } for symbol, symbol_fields in aligned.items()
+        },
+        'interval': interval,
+        'normalize': normalize,
+        'missing': missing
+    })
+
 @router.get("/timeframes")
 async def get_timeframes():
     """Get available chart timeframes"""
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database.database import get_db
+from app.models.data_coverage import DataCoverage, DataCoverageResponse
+from app.utils.coverage import find_gaps, rebuild_coverage
+from app.utils.market_calendar import count_trading_days
+from typing import List, Optional
+from datetime import datetime
+import logging
+
+router = APIRouter()
+
+@router.get("/", response_model=List[DataCoverageResponse])
+async def get_coverage(
+    symbol: Optional[str] = None,
+    exchange: Optional[str] = None,
+    interval: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get stored data ranges, optionally filtered by symbol/exchange/interval"""
+    query = db.query(DataCoverage)
+    if symbol:
+        query = query.filter(DataCoverage.symbol == symbol)
+    if exchange:
+        query = query.filter(DataCoverage.exchange == exchange)
+    if interval:
+        query = query.filter(DataCoverage.interval == interval)
+    
+    return query.order_by(
+        DataCoverage.symbol, DataCoverage.exchange, DataCoverage.interval, DataCoverage.start_date
+    ).all()
+
+@router.get("/gaps")
+async def get_gaps(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    exchange: str = "NSE",
+    interval: str = "D",
+    db: Session = Depends(get_db)
+):
+    """Get missing trading-day ranges for a symbol within a date range"""
+    try:
+        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    gaps = find_gaps(db, symbol, exchange, interval, start_date_obj, end_date_obj)
+    expected_days = count_trading_days(start_date_obj, end_date_obj)
+    missing_days = sum(gap['trading_days'] for gap in gaps)
+    
+    return {
+        'symbol': symbol,
+        'exchange': exchange,
+        'interval': interval,
+        'start_date': start_date_obj,
+        'end_date': end_date_obj,
+        'complete': not gaps,
+        'trading_days': expected_days,
+        'missing_days': missing_days,
+        'gaps': gaps
+    }
+
+@router.post("/rebuild")
+async def rebuild(symbol: str, exchange: str = "NSE", interval: str = "D", db: Session = Depends(get_db)):
+    """Rebuild the coverage index for a symbol from its stored bars"""
+    try:
+        rebuild_coverage(db, symbol, exchange, interval)
+        db.commit()
+        return {'message': f'Coverage rebuilt for {symbol} ({exchange}, {interval})'}
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error rebuilding coverage for {symbol}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,74 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Any, Optional
+from sqlalchemy import insert, select, literal
+from sqlalchemy.orm import Session
+from app.models.backtest import BacktestRun, BacktestFingerprint, Trade, Order, Position
+from app.utils.backtest_engine import DEFAULT_COMMISSION_RATE
+
+# Bump when engine changes alter the results of an otherwise identical run
+RESULT_VERSION = 1
+
+REUSE_MODES = ('return', 'clone')
+
+def backtest_fingerprint(config: Dict[str, Any], data_version) -> str:
+    """Content hash of everything that determines a run's results
+    
+    ``config`` holds the run inputs (strategy, resolved parameters, symbols,
+    exchange, date range, capital and execution settings); the commission
+    defaults to the engine rate when no execution model is given. Inputs that
+    only affect speed (e.g. max_workers) must be left out by the caller.
+    """
+    commission = (config.get('execution') or {}).get('commission') or {'model': 'percent', 'rate': DEFAULT_COMMISSION_RATE}
+    payload = json.dumps(
+        {**config, 'commission': commission, 'data_version': data_version, 'result_version': RESULT_VERSION},
+        sort_keys=True,
+        default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value)
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def record_fingerprint(db: Session, backtest_id: int, config_hash: str):
+    """Attach a fingerprint to a run (caller commits)"""
+    db.add(BacktestFingerprint(backtest_id=backtest_id, config_hash=config_hash))
+
+def find_completed_run(db: Session, config_hash: str) -> Optional[BacktestRun]:
+    """Most recent completed run with this fingerprint"""
+    return db.query(BacktestRun).join(
+        BacktestFingerprint, BacktestFingerprint.backtest_id == BacktestRun.id
+    ).filter(
+        BacktestFingerprint.config_hash == config_hash,
+        BacktestRun.status == 'completed'
+    ).order_by(BacktestRun.completed_at.desc()).first()
+
+def clone_run(db: Session, source: BacktestRun, name: str, config_hash: str) -> BacktestRun:
+    """Copy a completed run and its trades, orders and positions under a new name (caller commits)
+    
+    Detail rows are copied with INSERT ... SELECT, so nothing is recomputed or
+    loaded into Python.
+    """
+    backtest_run = BacktestRun(
+        name=name,
+        strategy_name=source.strategy_name,
+        symbol=source.symbol,
+        exchange=source.exchange,
+        start_date=source.start_date,
+        end_date=source.end_date,
+        initial_capital=source.initial_capital,
+        parameters=source.parameters,
+        status='completed',
+        results=source.results,
+        completed_at=datetime.now()
+    )
+    db.add(backtest_run)
+    db.flush()
+    
+    for model in (Trade, Order, Position):
+        table = model.__table__
+        columns = [column.name for column in table.columns if column.name not in ('id', 'backtest_id')]
+        db.execute(insert(table).from_select(
+            ['backtest_id', *columns],
+            select(literal(backtest_run.id), *(table.c[column] for column in columns)).where(table.c.backtest_id == source.id)
+        ))
+    record_fingerprint(db, backtest_run.id, config_hash)
+    return backtest_run
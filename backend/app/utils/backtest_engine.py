@@ -2,11 +2,26 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.models.stock_data import StockData
 from app.models.backtest import BacktestRun, Trade, Order, Position
+from app.utils.price_cache import load_price_arrays, price_frame
+from app.utils.position_ledger import PositionLedger
+from app.utils.execution import (
+    bar_events, check_execution, order_price, find_fill, SLIPPAGE_MODELS, COMMISSION_MODELS
+)
 import logging
 
+DEFAULT_COMMISSION_RATE = 0.001  # 0.1% commission
+
+# Timeline bars per block of forward-filled closes used to mark portfolio equity
+PORTFOLIO_MARK_BLOCK = 1024
+
+SIZING_MODES = ('equal_weight', 'fixed')
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if isinstance(value, str) else value
+
 class BacktestEngine:
     def __init__(self, db: Session):
         self.db = db
@@ -14,19 +29,23 @@ class BacktestEngine:
         self.positions = {}
         self.orders = []
         self.trades = []
-        self.portfolio_value = []
-        self.commission_rate = 0.001  # 0.1% commission
-        
+        self.portfolio_value = {}
+        self.commission_rate = DEFAULT_COMMISSION_RATE
+        # Commission model config ({'model': ..., params}) of event-driven runs; None uses commission_rate
+        self.commission = None
+        # Open lots and realized PnL per symbol; position rows recorded after each fill
+        self.ledger = PositionLedger()
+        self.position_snapshots = []
+        # When False, results carry metrics only (no per-bar values, trades or orders)
+        self.include_details = True
+        # Leading bars that only prime indicators: not traded and left out of the results
+        self.warmup_bars = 0
+        # Symbol recorded on orders and trades of single-symbol runs
+        self.symbol = 'SYMBOL'
+    
     def run_backtest(self, backtest_config: Dict[str, Any]) -> Dict[str, Any]:
         """Run a backtest with the given configuration"""
         try:
-            # Initialize backtest
-            self.cash = backtest_config['initial_capital']
-            self.positions = {}
-            self.orders = []
-            self.trades = []
-            self.portfolio_value = []
-            
             # Get historical data
             data = self._get_historical_data(
                 backtest_config['symbol'],
@@ -39,54 +58,126 @@ class BacktestEngine:
                 raise ValueError("No historical data found for the given parameters")
             
             # Run strategy
-            strategy_name = backtest_config['strategy_name']
-            strategy_params = backtest_config.get('parameters', {})
-            
-            if strategy_name == 'sma_crossover':
-                results = self._run_sma_crossover_strategy(data, strategy_params)
-            elif strategy_name == 'rsi_strategy':
-                results = self._run_rsi_strategy(data, strategy_params)
-            elif strategy_name == 'bollinger_bands':
-                results = self._run_bollinger_bands_strategy(data, strategy_params)
-            else:
-                raise ValueError(f"Unknown strategy: {strategy_name}")
-            
-            return results
-            
+            return self.run_strategy(
+                data,
+                backtest_config['strategy_name'],
+                backtest_config.get('parameters', {}),
+                backtest_config['initial_capital'],
+                symbol=backtest_config['symbol'],
+                lot_method=backtest_config.get('lot_method', 'fifo'),
+                execution=backtest_config.get('execution')
+            )
+        
         except Exception as e:
             logging.error(f"Backtest error: {str(e)}")
             raise
     
-    def _get_historical_data(self, symbol: str, exchange: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-        """Fetch historical data from database"""
-        data = self.db.query(StockData).filter(
-            StockData.symbol == symbol,
-            StockData.exchange == exchange,
-            StockData.date >= start_date.date(),
-            StockData.date <= end_date.date()
-        ).order_by(StockData.date, StockData.time).all()
-        
-        if not data:
-            return pd.DataFrame()
-        
-        # Convert to DataFrame
-        df_data = []
-        for item in data:
-            timestamp = datetime.combine(item.date, item.time or datetime.min.time())
-            df_data.append({
-                'timestamp': timestamp,
-                'open': item.open,
-                'high': item.high,
-                'low': item.low,
-                'close': item.close,
-                'volume': item.volume
-            })
+    def run_strategy(self, data: pd.DataFrame, strategy_name: str, strategy_params: Dict[str, Any],
+                     initial_capital: float, include_details: bool = True, warmup_bars: int = 0,
+                     symbol: str = 'SYMBOL', lot_method: str = 'fifo',
+                     execution: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a strategy over already loaded price data
+        
+        The data frame is not modified, so one load can serve many runs. The first
+        ``warmup_bars`` bars are used for indicator history only. ``lot_method``
+        ('fifo' or 'average') decides which lots a sell closes for PnL. Without
+        ``execution`` signals fill as market orders at the signal bar's close;
+        with it they place orders that fill on later bars (see _execute_orders).
+        """
+        if execution:
+            check_execution(execution)
+        
+        # Initialize backtest
+        self.cash = initial_capital
+        self.positions = {}
+        self.orders = []
+        self.trades = []
+        self.portfolio_value = {}
+        self.ledger = PositionLedger(lot_method)
+        self.position_snapshots = []
+        self.include_details = include_details
+        self.warmup_bars = warmup_bars
+        self.symbol = symbol
+        self.commission = execution.get('commission') if execution else None
+        
+        # Strategies add indicator columns; a shallow copy keeps them off the caller's frame
+        data = data.copy(deep=False)
+        buy_signals, sell_signals = self.generate_signals(data, strategy_name, strategy_params)
+        
+        # Execute trades
+        if execution:
+            self._execute_orders(data, buy_signals, sell_signals, execution)
+        else:
+            self._execute_signals(data, buy_signals, sell_signals)
+        
+        return self._calculate_results(data)
+    
+    def generate_signals(self, data: pd.DataFrame, strategy_name: str, strategy_params: Dict[str, Any]):
+        """Buy and sell signal masks of a strategy; indicator columns are added to ``data``"""
+        if strategy_name == 'sma_crossover':
+            return self._sma_crossover_signals(data, strategy_params)
+        elif strategy_name == 'rsi_strategy':
+            return self._rsi_signals(data, strategy_params)
+        elif strategy_name == 'bollinger_bands':
+            return self._bollinger_bands_signals(data, strategy_params)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+    
+    def save_results(self, backtest_run: BacktestRun, results: Dict[str, Any]):
+        """Add the trades, orders and position snapshots of a finished run (executemany inserts, no ORM objects)"""
+        trades = [
+            {
+                'backtest_id': backtest_run.id,
+                'symbol': trade_data.get('symbol', backtest_run.symbol),
+                'side': trade_data['side'],
+                'quantity': trade_data['quantity'],
+                'price': trade_data['price'],
+                'timestamp': _parse_timestamp(trade_data['timestamp']),
+                'order_id': trade_data.get('order_id'),
+                'commission': trade_data.get('commission', 0),
+                'pnl': trade_data.get('pnl', 0)
+            } for trade_data in results.get('trades', [])
+        ]
+        if trades:
+            self.db.execute(insert(Trade), trades)
+        
+        orders = [
+            {
+                'backtest_id': backtest_run.id,
+                'order_id': order_data['order_id'],
+                'symbol': order_data.get('symbol', backtest_run.symbol),
+                'side': order_data['side'],
+                'order_type': order_data['order_type'],
+                'quantity': order_data['quantity'],
+                'price': order_data.get('price'),
+                'status': order_data['status'],
+                'timestamp': _parse_timestamp(order_data['timestamp']),
+                'filled_quantity': order_data.get('filled_quantity', 0),
+                'filled_price': order_data.get('filled_price')
+            } for order_data in results.get('orders', [])
+        ]
+        if orders:
+            self.db.execute(insert(Order), orders)
         
-        df = pd.DataFrame(df_data)
-        df.set_index('timestamp', inplace=True)
-        return df
+        positions = [
+            {
+                'backtest_id': backtest_run.id,
+                'symbol': position_data['symbol'],
+                'quantity': position_data['quantity'],
+                'avg_price': position_data['avg_price'],
+                'current_price': position_data.get('current_price'),
+                'pnl': position_data.get('pnl', 0),
+                'timestamp': _parse_timestamp(position_data['timestamp'])
+            } for position_data in results.get('positions', [])
+        ]
+        if positions:
+            self.db.execute(insert(Position), positions)
     
-    def _run_sma_crossover_strategy(self, data: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_historical_data(self, symbol: str, exchange: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Fetch historical data through the shared columnar price cache"""
+        return price_frame(load_price_arrays(self.db, symbol, exchange, start_date, end_date))
+    
+    def _sma_crossover_signals(self, data: pd.DataFrame, params: Dict[str, Any]):
         """Simple Moving Average Crossover Strategy"""
         short_window = params.get('short_window', 20)
         long_window = params.get('long_window', 50)
@@ -96,35 +187,16 @@ class BacktestEngine:
         data['sma_long'] = data['close'].rolling(window=long_window).mean()
         
         # Generate signals
-        data['signal'] = 0
-        data['signal'][short_window:] = np.where(
-            data['sma_short'][short_window:] > data['sma_long'][short_window:], 1, 0
+        signal = np.zeros(len(data), dtype=np.int64)
+        signal[short_window:] = np.where(
+            data['sma_short'].to_numpy()[short_window:] > data['sma_long'].to_numpy()[short_window:], 1, 0
         )
+        data['signal'] = signal
         data['position'] = data['signal'].diff()
         
-        # Execute trades
-        position = 0
-        for timestamp, row in data.iterrows():
-            if row['position'] == 1:  # Buy signal
-                if position == 0:
-                    position = self._execute_buy_order(timestamp, row['close'], 100)
-            elif row['position'] == -1:  # Sell signal
-                if position > 0:
-                    self._execute_sell_order(timestamp, row['close'], position)
-                    position = 0
-            
-            # Update portfolio value
-            portfolio_val = self.cash + (position * row['close'] if position > 0 else 0)
-            self.portfolio_value.append({
-                'timestamp': timestamp,
-                'value': portfolio_val,
-                'cash': self.cash,
-                'position_value': position * row['close'] if position > 0 else 0
-            })
-        
-        return self._calculate_results(data)
+        return data['position'].to_numpy() == 1, data['position'].to_numpy() == -1
     
-    def _run_rsi_strategy(self, data: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _rsi_signals(self, data: pd.DataFrame, params: Dict[str, Any]):
         """RSI Strategy"""
         rsi_period = params.get('rsi_period', 14)
         oversold_threshold = params.get('oversold_threshold', 30)
@@ -146,27 +218,9 @@ class BacktestEngine:
         data.loc[data['rsi'] < oversold_threshold, 'signal'] = 1  # Buy
         data.loc[data['rsi'] > overbought_threshold, 'signal'] = -1  # Sell
         
-        # Execute trades
-        position = 0
-        for timestamp, row in data.iterrows():
-            if row['signal'] == 1 and position == 0:  # Buy signal
-                position = self._execute_buy_order(timestamp, row['close'], 100)
-            elif row['signal'] == -1 and position > 0:  # Sell signal
-                self._execute_sell_order(timestamp, row['close'], position)
-                position = 0
-            
-            # Update portfolio value
-            portfolio_val = self.cash + (position * row['close'] if position > 0 else 0)
-            self.portfolio_value.append({
-                'timestamp': timestamp,
-                'value': portfolio_val,
-                'cash': self.cash,
-                'position_value': position * row['close'] if position > 0 else 0
-            })
-        
-        return self._calculate_results(data)
+        return data['signal'].to_numpy() == 1, data['signal'].to_numpy() == -1
     
-    def _run_bollinger_bands_strategy(self, data: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _bollinger_bands_signals(self, data: pd.DataFrame, params: Dict[str, Any]):
         """Bollinger Bands Strategy"""
         window = params.get('window', 20)
         num_std = params.get('num_std', 2)
@@ -182,30 +236,303 @@ class BacktestEngine:
         data.loc[data['close'] < data['lower_band'], 'signal'] = 1  # Buy
         data.loc[data['close'] > data['upper_band'], 'signal'] = -1  # Sell
         
-        # Execute trades
+        return data['signal'].to_numpy() == 1, data['signal'].to_numpy() == -1
+    
+    def _execute_signals(self, data: pd.DataFrame, buy_signals: np.ndarray, sell_signals: np.ndarray, quantity: int = 100):
+        """Turn buy/sell signal masks into fills and a per-bar equity curve
+        
+        A buy signal opens a position when flat and a sell signal closes it when
+        long. Only the signal bars that can change the position are visited
+        (found by binary search over the signal indices); cash and position between
+        fills are forward-filled with array operations.
+        """
+        timestamps = data.index.values
+        close = data['close'].to_numpy(dtype=np.float64)
+        buy_bars = np.flatnonzero(buy_signals)
+        sell_bars = np.flatnonzero(sell_signals)
+        if self.warmup_bars:
+            buy_bars = buy_bars[buy_bars >= self.warmup_bars]
+            sell_bars = sell_bars[sell_bars >= self.warmup_bars]
+        initial_cash = self.cash
+        
+        fill_bars = []
+        fill_positions = []
+        fill_cash = []
         position = 0
-        for timestamp, row in data.iterrows():
-            if row['signal'] == 1 and position == 0:  # Buy signal
-                position = self._execute_buy_order(timestamp, row['close'], 100)
-            elif row['signal'] == -1 and position > 0:  # Sell signal
-                self._execute_sell_order(timestamp, row['close'], position)
+        cursor = 0
+        while True:
+            candidates = sell_bars if position > 0 else buy_bars
+            k = candidates.searchsorted(cursor)
+            if k == len(candidates):
+                break
+            i = candidates[k]
+            cursor = i + 1
+            
+            timestamp = pd.Timestamp(timestamps[i])
+            if position > 0:
+                self._execute_sell_order(timestamp, close[i], position)
                 position = 0
+            else:
+                position = self._execute_buy_order(timestamp, close[i], quantity)
+                if position == 0:
+                    continue
             
-            # Update portfolio value
-            portfolio_val = self.cash + (position * row['close'] if position > 0 else 0)
-            self.portfolio_value.append({
-                'timestamp': timestamp,
-                'value': portfolio_val,
-                'cash': self.cash,
-                'position_value': position * row['close'] if position > 0 else 0
-            })
+            fill_bars.append(i)
+            fill_positions.append(position)
+            fill_cash.append(self.cash)
         
-        return self._calculate_results(data)
+        self._record_equity(timestamps, close, fill_bars, fill_positions, fill_cash, initial_cash)
     
-    def _execute_buy_order(self, timestamp: datetime, price: float, quantity: int) -> int:
+    def _execute_orders(self, data: pd.DataFrame, buy_signals: np.ndarray, sell_signals: np.ndarray,
+                        execution: Dict[str, Any], quantity: int = 100):
+        """Event-driven execution: a signal at a bar's close places an order for later bars
+        
+        Market orders fill at the next bar's open; limit and stop orders are priced
+        off the signal bar's close (``limit_offset``/``stop_offset`` fractions) and
+        fill on the first bar whose high/low reaches them, or are cancelled after
+        ``valid_bars`` bars. While an order works, further signals are ignored.
+        Market and stop fills pay the slippage model, bounded by the fill bar's
+        range. Only order placements and fill bars are visited in Python.
+        """
+        events = bar_events(data)
+        n = len(events.close)
+        order_type = execution.get('order_type', 'market')
+        limit_offset = execution.get('limit_offset', 0.0)
+        stop_offset = execution.get('stop_offset', 0.0)
+        valid_bars = execution.get('valid_bars')
+        slippage = execution.get('slippage') or {}
+        slip = SLIPPAGE_MODELS[slippage.get('model', 'none')]
+        
+        buy_bars = np.flatnonzero(buy_signals)
+        sell_bars = np.flatnonzero(sell_signals)
+        if self.warmup_bars:
+            buy_bars = buy_bars[buy_bars >= self.warmup_bars]
+            sell_bars = sell_bars[sell_bars >= self.warmup_bars]
+        initial_cash = self.cash
+        
+        fill_bars = []
+        fill_positions = []
+        fill_cash = []
+        position = 0
+        cursor = 0
+        while True:
+            candidates = sell_bars if position > 0 else buy_bars
+            k = candidates.searchsorted(cursor)
+            if k == len(candidates):
+                break
+            i = int(candidates[k])
+            side = 'SELL' if position > 0 else 'BUY'
+            price = order_price(order_type, side, float(events.close[i]), limit_offset, stop_offset)
+            expiry = n if valid_bars is None else min(n, i + 1 + valid_bars)
+            j, fill_price = find_fill(events, order_type, side, price, i + 1, expiry)
+            
+            if j is None:
+                self._record_unfilled_order(pd.Timestamp(events.timestamp[i]), side, order_type, position or quantity,
+                                            price, 'PENDING' if expiry == n else 'CANCELLED')
+                if expiry == n:
+                    break
+                cursor = expiry
+                continue
+            
+            if order_type != 'limit':
+                fill_price = slip(side, fill_price, position or quantity, slippage)
+                fill_price = min(fill_price, float(events.high[j])) if side == 'BUY' else max(fill_price, float(events.low[j]))
+            
+            timestamp = pd.Timestamp(events.timestamp[j])
+            if position > 0:
+                self._execute_sell_order(timestamp, fill_price, position, order_type=order_type.upper(), order_price=price)
+                position = 0
+            else:
+                position = self._execute_buy_order(timestamp, fill_price, quantity, order_type=order_type.upper(), order_price=price)
+                if position == 0:
+                    cursor = j + 1
+                    continue
+            
+            # The fill bar's own close may already signal the next order
+            cursor = j
+            fill_bars.append(j)
+            fill_positions.append(position)
+            fill_cash.append(self.cash)
+        
+        self._record_equity(events.timestamp, events.close, fill_bars, fill_positions, fill_cash, initial_cash)
+    
+    def _record_equity(self, timestamps: np.ndarray, close: np.ndarray, fill_bars: List[int],
+                       fill_positions: List[int], fill_cash: List[float], initial_cash: float):
+        """Per-bar cash, position value and equity forward-filled from the fills"""
+        # State after the latest fill at or before each bar
+        last_fill = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(len(close)), side='right') - 1
+        filled = last_fill >= 0
+        positions = np.where(filled, np.asarray(fill_positions + [0], dtype=np.int64)[last_fill], 0)
+        cash = np.where(filled, np.asarray(fill_cash + [initial_cash], dtype=np.float64)[last_fill], initial_cash)
+        position_value = np.where(positions > 0, positions * close, 0)
+        
+        self.portfolio_value = {
+            'timestamp': timestamps.astype('datetime64[s]')[self.warmup_bars:],
+            'value': (cash + position_value)[self.warmup_bars:],
+            'cash': cash[self.warmup_bars:],
+            'position_value': position_value[self.warmup_bars:]
+        }
+        if len(timestamps):
+            self._snapshot_open_positions({self.symbol: (pd.Timestamp(timestamps[-1]), close[-1])})
+    
+    def _snapshot_open_positions(self, marks: Dict[Any, tuple]):
+        """Record a closing position row for every instrument still held, marked at (timestamp, price)"""
+        if not self.include_details:
+            return
+        for key in self.ledger.symbols():
+            if self.ledger.quantity(key) and key in marks:
+                timestamp, price = marks[key]
+                self.position_snapshots.append(self._snapshot(key, float(price), timestamp))
+    
+    def _snapshot(self, key, price: float, timestamp) -> Dict[str, Any]:
+        """Ledger position row; portfolio keys are (symbol, exchange) and are split into both fields"""
+        snapshot = self.ledger.snapshot(key, price, timestamp)
+        if isinstance(key, tuple):
+            snapshot['symbol'], snapshot['exchange'] = key
+        return snapshot
+    
+    def run_portfolio(self, timestamps: np.ndarray, series: List[Dict[str, Any]], initial_capital: float,
+                      sizing: str = 'equal_weight', allocation: float = None, max_positions: int = None,
+                      quantity: int = 100, include_details: bool = True, lot_method: str = 'fifo') -> Dict[str, Any]:
+        """Trade several symbols from one cash balance on a merged event timeline
+        
+        ``timestamps`` is the sorted union of all bar times. Each ``series`` entry
+        has a 'symbol' and 'exchange', its bars' positions on the timeline ('bars'), their
+        'close' prices and 'buy'/'sell' signal bar indices from generate_signals.
+        Fills are processed in time order, sells before buys on the same bar so
+        freed cash can fund new positions. 'equal_weight' sizing invests
+        ``allocation`` of current equity (default 1 / number of symbols) in each
+        new position; 'fixed' buys ``quantity`` shares. Positions are keyed by
+        (symbol, exchange), so a symbol listed on two exchanges is two instruments.
+        """
+        if not series:
+            raise ValueError("No symbols to backtest")
+        if sizing not in SIZING_MODES:
+            raise ValueError(f"Unknown sizing: {sizing}")
+        allocation = allocation or 1 / max(len(series), 1)
+        if not 0 < allocation <= 1:
+            raise ValueError("allocation must be in (0, 1]")
+        
+        self.cash = initial_capital
+        self.orders = []
+        self.trades = []
+        self.ledger = PositionLedger(lot_method)
+        self.position_snapshots = []
+        self.include_details = include_details
+        self.warmup_bars = 0
+        self.commission = None
+        
+        # One event per signal bar, ordered by time with sells (0) ahead of buys (1)
+        parts = {'bars': [], 'kinds': [], 'series': [], 'local': []}
+        for j, entry in enumerate(series):
+            for kind, side in ((0, 'sell'), (1, 'buy')):
+                local = np.asarray(entry[side], dtype=np.int64)
+                parts['bars'].append(entry['bars'][local])
+                parts['kinds'].append(np.full(len(local), kind, dtype=np.int8))
+                parts['series'].append(np.full(len(local), j, dtype=np.int64))
+                parts['local'].append(local)
+        event_bars, event_kinds, event_series, event_local = (
+            np.concatenate(parts[key]) for key in ('bars', 'kinds', 'series', 'local')
+        )
+        order = np.lexsort((event_kinds, event_bars))
+        
+        # Latest close of every series per timeline bar, built one block of bars at a time
+        marks = {'start': None, 'rows': None}
+        def marks_at(bar):
+            start = bar - bar % PORTFOLIO_MARK_BLOCK
+            if marks['start'] != start:
+                span = np.arange(start, min(start + PORTFOLIO_MARK_BLOCK, len(timestamps)))
+                rows = np.zeros((len(span), len(series)), dtype=np.float64)
+                for k, entry in enumerate(series):
+                    local = entry['bars'].searchsorted(span, side='right') - 1
+                    rows[:, k] = np.where(local >= 0, entry['close'][np.maximum(local, 0)], 0)
+                marks.update(start=start, rows=rows)
+            return marks['rows'][bar - start]
+        
+        held_quantity = np.zeros(len(series), dtype=np.float64)
+        holdings = {}  # series index -> (quantity, entry bar)
+        holding_periods = []
+        fill_bars = []
+        fill_cash = []
+        for e in order:
+            bar, kind, j, local = event_bars[e], event_kinds[e], event_series[e], event_local[e]
+            entry = series[j]
+            price = entry['close'][local]
+            timestamp = pd.Timestamp(timestamps[bar])
+            
+            if kind == 0:
+                if j not in holdings:
+                    continue
+                held, entry_bar = holdings.pop(j)
+                held_quantity[j] = 0
+                self._execute_sell_order(timestamp, price, held, entry['symbol'], exchange=entry['exchange'])
+                holding_periods.append((j, held, entry_bar, bar))
+            else:
+                if j in holdings or (max_positions and len(holdings) >= max_positions):
+                    continue
+                if sizing == 'fixed':
+                    size = quantity
+                else:
+                    equity = self.cash + held_quantity @ marks_at(bar)
+                    size = int(min(equity * allocation, self.cash) // (price * (1 + self.commission_rate)))
+                if size <= 0 or self._execute_buy_order(timestamp, price, size, entry['symbol'], exchange=entry['exchange']) == 0:
+                    continue
+                holdings[j] = (size, bar)
+                held_quantity[j] = size
+            
+            fill_bars.append(bar)
+            fill_cash.append(self.cash)
+        
+        holding_periods.extend((j, held, entry_bar, len(timestamps)) for j, (held, entry_bar) in holdings.items())
+        
+        # Cash after the latest fill at or before each bar, plus the marked value of open holdings
+        last_fill = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(len(timestamps)), side='right') - 1
+        cash = np.where(last_fill >= 0, np.asarray(fill_cash + [initial_capital], dtype=np.float64)[last_fill], initial_capital)
+        position_value = np.zeros(len(timestamps), dtype=np.float64)
+        for j, held, start, end in holding_periods:
+            entry = series[j]
+            local = entry['bars'].searchsorted(np.arange(start, end), side='right') - 1
+            position_value[start:end] += held * entry['close'][local]
+        
+        self.portfolio_value = {
+            'timestamp': timestamps.astype('datetime64[s]'),
+            'value': cash + position_value,
+            'cash': cash,
+            'position_value': position_value
+        }
+        self.positions = {(series[j]['symbol'], series[j]['exchange']): held for j, (held, _) in holdings.items()}
+        self._snapshot_open_positions({
+            (entry['symbol'], entry['exchange']): (pd.Timestamp(timestamps[entry['bars'][-1]]), entry['close'][-1]) for entry in series
+        })
+        return self._calculate_results(None)
+    
+    def _commission(self, value: float, quantity: int) -> float:
+        if self.commission is None:
+            return value * self.commission_rate
+        return COMMISSION_MODELS[self.commission.get('model', 'percent')](value, quantity, self.commission)
+    
+    def _record_unfilled_order(self, timestamp: datetime, side: str, order_type: str, quantity: int,
+                               price: Optional[float], status: str):
+        self.orders.append({
+            'order_id': f"{side}_{len(self.orders) + 1}",
+            'symbol': self.symbol,
+            'side': side,
+            'order_type': order_type.upper(),
+            'quantity': quantity,
+            'price': price,
+            'status': status,
+            'timestamp': timestamp,
+            'filled_quantity': 0,
+            'filled_price': None
+        })
+    
+    def _execute_buy_order(self, timestamp: datetime, price: float, quantity: int, symbol: str = None,
+                           order_type: str = 'MARKET', order_price: Optional[float] = None, exchange: str = None) -> int:
         """Execute a buy order"""
+        symbol = symbol or self.symbol
+        key = (symbol, exchange) if exchange else symbol
         total_cost = price * quantity
-        commission = total_cost * self.commission_rate
+        commission = self._commission(total_cost, quantity)
         
         if self.cash >= total_cost + commission:
             self.cash -= (total_cost + commission)
@@ -214,20 +541,26 @@ class BacktestEngine:
             order_id = f"BUY_{len(self.orders) + 1}"
             self.orders.append({
                 'order_id': order_id,
-                'symbol': 'SYMBOL',
+                'symbol': symbol,
+                **({'exchange': exchange} if exchange else {}),
                 'side': 'BUY',
-                'order_type': 'MARKET',
+                'order_type': order_type,
                 'quantity': quantity,
-                'price': price,
+                'price': price if order_price is None else order_price,
                 'status': 'FILLED',
                 'timestamp': timestamp,
                 'filled_quantity': quantity,
                 'filled_price': price
             })
             
+            self.ledger.buy(key, quantity, price)
+            if self.include_details:
+                self.position_snapshots.append(self._snapshot(key, price, timestamp))
+            
             # Record trade
             self.trades.append({
-                'symbol': 'SYMBOL',
+                'symbol': symbol,
+                **({'exchange': exchange} if exchange else {}),
                 'side': 'BUY',
                 'quantity': quantity,
                 'price': price,
@@ -240,10 +573,13 @@ class BacktestEngine:
             return quantity
         return 0
     
-    def _execute_sell_order(self, timestamp: datetime, price: float, quantity: int):
+    def _execute_sell_order(self, timestamp: datetime, price: float, quantity: int, symbol: str = None,
+                            order_type: str = 'MARKET', order_price: Optional[float] = None, exchange: str = None):
         """Execute a sell order"""
+        symbol = symbol or self.symbol
+        key = (symbol, exchange) if exchange else symbol
         total_value = price * quantity
-        commission = total_value * self.commission_rate
+        commission = self._commission(total_value, quantity)
         
         self.cash += (total_value - commission)
         
@@ -251,28 +587,27 @@ class BacktestEngine:
         order_id = f"SELL_{len(self.orders) + 1}"
         self.orders.append({
             'order_id': order_id,
-            'symbol': 'SYMBOL',
+            'symbol': symbol,
+            **({'exchange': exchange} if exchange else {}),
             'side': 'SELL',
-            'order_type': 'MARKET',
+            'order_type': order_type,
             'quantity': quantity,
-            'price': price,
+            'price': price if order_price is None else order_price,
             'status': 'FILLED',
             'timestamp': timestamp,
             'filled_quantity': quantity,
             'filled_price': price
         })
         
-        # Calculate PnL (simplified)
-        buy_trades = [t for t in self.trades if t['side'] == 'BUY']
-        if buy_trades:
-            avg_buy_price = sum(t['price'] for t in buy_trades) / len(buy_trades)
-            pnl = (price - avg_buy_price) * quantity
-        else:
-            pnl = 0
+        # Realized PnL of the lots this sell closes
+        pnl = self.ledger.sell(key, quantity, price)
+        if self.include_details:
+            self.position_snapshots.append(self._snapshot(key, price, timestamp))
         
         # Record trade
         self.trades.append({
-            'symbol': 'SYMBOL',
+            'symbol': symbol,
+            **({'exchange': exchange} if exchange else {}),
             'side': 'SELL',
             'quantity': quantity,
             'price': price,
@@ -284,7 +619,7 @@ class BacktestEngine:
     
     def _calculate_results(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Calculate backtest results and metrics"""
-        if not self.portfolio_value:
+        if not self.portfolio_value or len(self.portfolio_value['value']) == 0:
             return {
                 'total_return': 0,
                 'total_trades': 0,
@@ -297,9 +632,9 @@ class BacktestEngine:
                 'orders': []
             }
         
-        portfolio_df = pd.DataFrame(self.portfolio_value)
-        initial_value = self.portfolio_value[0]['value']
-        final_value = self.portfolio_value[-1]['value']
+        portfolio_df = pd.DataFrame({'value': self.portfolio_value['value']})
+        initial_value = float(self.portfolio_value['value'][0])
+        final_value = float(self.portfolio_value['value'][-1])
         
         # Calculate metrics
         total_return = ((final_value - initial_value) / initial_value) * 100
@@ -321,7 +656,7 @@ class BacktestEngine:
         else:
             sharpe_ratio = 0
         
-        return {
+        metrics = {
             'total_return': round(total_return, 2),
             'total_trades': total_trades,
             'winning_trades': winning_trades,
@@ -331,14 +666,28 @@ class BacktestEngine:
             'sharpe_ratio': round(sharpe_ratio, 2),
             'initial_capital': initial_value,
             'final_capital': final_value,
+            'realized_pnl': round(self.ledger.total_realized, 2),
+            'unrealized_pnl': round(float(self.portfolio_value['position_value'][-1]) - self.ledger.open_cost(), 2)
+        }
+        if not self.include_details:
+            return metrics
+        
+        return {
+            **metrics,
             'portfolio_values': [
                 {
-                    'timestamp': item['timestamp'].isoformat(),
-                    'value': item['value'],
-                    'cash': item['cash'],
-                    'position_value': item['position_value']
-                } for item in self.portfolio_value
+                    'timestamp': timestamp,
+                    'value': value,
+                    'cash': cash,
+                    'position_value': position_value
+                } for timestamp, value, cash, position_value in zip(
+                    np.datetime_as_string(self.portfolio_value['timestamp'], unit='s').tolist(),
+                    self.portfolio_value['value'].tolist(),
+                    self.portfolio_value['cash'].tolist(),
+                    self.portfolio_value['position_value'].tolist()
+                )
             ],
             'trades': self.trades,
-            'orders': self.orders
+            'orders': self.orders,
+            'positions': self.position_snapshots
         }
\ No newline at end of file
@@ -0,0 +1,169 @@
+import math
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from app.utils.backtest_sweep import run_sweep, rank_results, check_rank_metric, is_valid_combination, _parameter_values
+
+MAX_OPTIMIZER_BUDGET = 1000
+
+# Finished optimizer runs kept in memory for polling
+MAX_TRACKED_RUNS = 50
+
+def _sampler(name: str, spec: Dict[str, Any], requested):
+    """Return a function drawing one value of a parameter from its range"""
+    if requested is None:
+        return lambda rng: spec['default']
+    if not isinstance(requested, dict):
+        # Lists and fixed values are cast and bounds-checked as for sweeps
+        values = _parameter_values(name, spec, requested)
+        if not isinstance(requested, list):
+            return lambda rng: values[0]
+        return lambda rng: values[int(rng.integers(len(values)))]
+    
+    cast = int if spec['type'] == 'int' else float
+    low = cast(requested.get('min', spec['min']))
+    high = cast(requested.get('max', spec['max']))
+    if low < spec['min'] or high > spec['max'] or low > high:
+        raise ValueError(f"Range for {name} must lie within [{spec['min']}, {spec['max']}]")
+    if spec['type'] == 'int':
+        return lambda rng: int(rng.integers(int(low), int(high) + 1))
+    return lambda rng: round(float(rng.uniform(low, high)), 4)
+
+def parameter_samplers(strategy_name: str, schema: Dict[str, Dict[str, Any]], ranges: Dict[str, Any]):
+    """One sampler per schema parameter; raises ValueError for unknown parameters or values out of bounds"""
+    unknown = set(ranges or {}) - set(schema)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy_name}: {', '.join(sorted(unknown))}")
+    return {name: _sampler(name, spec, (ranges or {}).get(name)) for name, spec in schema.items()}
+
+def sample_candidates(strategy_name: str, schema: Dict[str, Dict[str, Any]], ranges: Dict[str, Any],
+                      count: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Draw up to ``count`` distinct valid parameter sets (fewer if the space is smaller)"""
+    samplers = parameter_samplers(strategy_name, schema, ranges)
+    candidates = {}
+    for _ in range(count * 20):
+        if len(candidates) >= count:
+            break
+        params = {name: sample(rng) for name, sample in samplers.items()}
+        if is_valid_combination(strategy_name, params):
+            candidates.setdefault(tuple(params.values()), params)
+    return list(candidates.values())
+
+def halving_schedule(budget: int, eta: int, min_fraction: float):
+    """Rung sizes and data fractions for successive halving under a budget
+    
+    The budget counts full-data backtests. Rung k evaluates n0 / eta**k
+    candidates on eta**(k - K) of the data, so every rung costs about the same
+    and the total stays near the budget.
+    """
+    rungs = max(0, int(math.floor(math.log(1 / min_fraction, eta) + 1e-9))) + 1
+    initial = max(1, int(budget * eta ** (rungs - 1) / rungs))
+    return [
+        (max(1, math.ceil(initial / eta ** k)), float(eta) ** (k - (rungs - 1)))
+        for k in range(rungs)
+    ]
+
+def successive_halving(data: pd.DataFrame, strategy_name: str, schema: Dict[str, Dict[str, Any]],
+                       ranges: Dict[str, Any], initial_capital: float, budget: int = 30, eta: int = 3,
+                       min_fraction: float = 1 / 9, sort_by: str = 'sharpe_ratio', seed: int = None,
+                       max_workers: int = None, progress=None) -> Dict[str, Any]:
+    """Random search with successive halving over shortened data windows
+    
+    Candidates are sampled from the parameter ranges and first evaluated on the
+    most recent slice of the data; only the best 1/eta of each rung is promoted
+    to a window eta times longer, ending on the full range. The same seed always
+    yields the same candidates and results. ``progress`` receives a dict after
+    every evaluation.
+    """
+    if not 1 <= budget <= MAX_OPTIMIZER_BUDGET:
+        raise ValueError(f"Budget must be between 1 and {MAX_OPTIMIZER_BUDGET}")
+    if eta < 2 or not 0 < min_fraction <= 1:
+        raise ValueError("eta must be at least 2 and min_fraction in (0, 1]")
+    check_rank_metric(sort_by)
+    
+    seed = int(np.random.SeedSequence().entropy % 2 ** 32) if seed is None else seed
+    rng = np.random.default_rng(seed)
+    schedule = halving_schedule(budget, eta, min_fraction)
+    candidates = sample_candidates(strategy_name, schema, ranges, schedule[0][0], rng)
+    
+    state = {'seed': seed, 'rungs': len(schedule), 'rung': 0, 'evaluated': 0, 'budget': budget, 'budget_used': 0.0}
+    rung_summaries = []
+    ranked = []
+    for rung, (size, fraction) in enumerate(schedule):
+        candidates = candidates[:size]
+        window = data.iloc[-max(1, int(round(len(data) * fraction))):]
+        state.update({'rung': rung + 1, 'rung_candidates': len(candidates), 'rung_bars': len(window)})
+        evaluated_before = state['evaluated']
+        
+        def on_result(done):
+            state['evaluated'] = evaluated_before + done
+            state['budget_used'] = round(state['budget_used'] + len(window) / len(data), 4)
+            if progress:
+                progress(dict(state))
+        
+        ranked = rank_results(
+            run_sweep(window, strategy_name, candidates, initial_capital, max_workers, on_result),
+            sort_by
+        )
+        rung_summaries.append({
+            'rung': rung + 1,
+            'candidates': len(candidates),
+            'bars': len(window),
+            'start': window.index[0].isoformat(),
+            'best': ranked[0] if ranked else None
+        })
+        
+        if rung + 1 < len(schedule):
+            candidates = [row['parameters'] for row in ranked if 'error' not in row]
+    
+    return {
+        'seed': seed,
+        'budget': budget,
+        'budget_used': state['budget_used'],
+        'evaluations': state['evaluated'],
+        'eta': eta,
+        'sort_by': sort_by,
+        'rungs': rung_summaries,
+        'results': ranked
+    }
+
+class OptimizerRegistry:
+    """In-memory status of background optimizer runs for progress polling"""
+    
+    def __init__(self, max_runs: int = MAX_TRACKED_RUNS):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def create(self, request: Dict[str, Any]) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._runs[run_id] = {
+                'id': run_id,
+                'status': 'pending',
+                'request': request,
+                'progress': {},
+                'result': None,
+                'error': None,
+                'created_at': datetime.now().isoformat()
+            }
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run_id
+    
+    def update(self, run_id: str, **fields):
+        with self._lock:
+            if run_id in self._runs:
+                self._runs[run_id].update(fields)
+    
+    def get(self, run_id: str):
+        with self._lock:
+            run = self._runs.get(run_id)
+            return dict(run) if run else None
+
+# Create global optimizer registry instance
+optimizer_runs = OptimizerRegistry()
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.utils.backtest_engine import BacktestEngine
+from app.utils.backtest_sweep import map_shared
+from app.utils.ohlcv import OHLCV_FIELDS
+from app.utils.price_cache import load_price_arrays_multi
+
+MAX_PORTFOLIO_SYMBOLS = 500
+
+# BacktestRun.symbol of runs covering several symbols
+PORTFOLIO_SYMBOL = 'PORTFOLIO'
+
+def load_portfolio_data(db: Session, instruments: List[Tuple[str, str]], start_date: datetime, end_date: datetime):
+    """Bars of every (symbol, exchange) as NumPy columns; cache misses load with one IN query per exchange"""
+    by_exchange = {}
+    for symbol, exchange in instruments:
+        by_exchange.setdefault(exchange, []).append(symbol)
+    
+    series = {}
+    for exchange, symbols in by_exchange.items():
+        for symbol, arrays in load_price_arrays_multi(db, symbols, exchange, start_date, end_date).items():
+            series[(symbol, exchange)] = arrays
+    return {instrument: series[instrument] for instrument in instruments}
+
+def symbol_signals(data: pd.DataFrame, strategy_name: str, params: Dict[str, Any], start: int, end: int):
+    """Buy and sell bar indices of one symbol's rows within the stacked frame"""
+    buy_signals, sell_signals = BacktestEngine(None).generate_signals(
+        data.iloc[start:end].copy(deep=False), strategy_name, params
+    )
+    return np.flatnonzero(buy_signals), np.flatnonzero(sell_signals)
+
+def run_portfolio_backtest(series: Dict[Tuple[str, str], Dict[str, np.ndarray]], strategy_name: str,
+                           params: Dict[str, Any], initial_capital: float, sizing: str = 'equal_weight',
+                           allocation: float = None, max_positions: int = None, quantity: int = 100,
+                           max_workers: int = None, lot_method: str = 'fifo') -> Dict[str, Any]:
+    """Backtest a strategy over many symbols sharing one capital pool
+    
+    Signals are generated per symbol in parallel over one stacked shared-memory
+    frame; fills are then merged on a single timeline by BacktestEngine.run_portfolio.
+    """
+    instruments = [instrument for instrument, arrays in series.items() if len(arrays['datetime'])]
+    if not instruments:
+        raise ValueError("No historical data found for the given symbols")
+    
+    lengths = [len(series[instrument]['datetime']) for instrument in instruments]
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    stacked = pd.DataFrame(
+        {field: np.concatenate([series[instrument][field] for instrument in instruments]).astype(np.float64) for field in OHLCV_FIELDS},
+        index=pd.DatetimeIndex(np.concatenate([series[instrument]['datetime'] for instrument in instruments]), name='timestamp')
+    )
+    signals = map_shared(
+        stacked,
+        symbol_signals,
+        [(strategy_name, params, int(offsets[k]), int(offsets[k + 1])) for k in range(len(instruments))],
+        max_workers
+    )
+    
+    timestamps = np.unique(stacked.index.values)
+    engine = BacktestEngine(None)
+    results = engine.run_portfolio(
+        timestamps,
+        [
+            {
+                'symbol': symbol,
+                'exchange': exchange,
+                'bars': timestamps.searchsorted(series[(symbol, exchange)]['datetime']),
+                'close': series[(symbol, exchange)]['close'],
+                'buy': buy,
+                'sell': sell
+            } for (symbol, exchange), (buy, sell) in zip(instruments, signals)
+        ],
+        initial_capital,
+        sizing=sizing,
+        allocation=allocation,
+        max_positions=max_positions,
+        quantity=quantity,
+        lot_method=lot_method
+    )
+    
+    # Per-instrument breakdown of the shared run, keyed like the ledger by (symbol, exchange)
+    summary = {instrument: {'symbol': instrument[0], 'exchange': instrument[1], 'bars': length, 'trades': 0}
+               for instrument, length in zip(instruments, lengths)}
+    for trade in engine.trades:
+        summary[(trade['symbol'], trade['exchange'])]['trades'] += 1
+    for instrument, row in summary.items():
+        row['realized_pnl'] = float(engine.ledger.realized(instrument))
+        row['open_quantity'] = engine.ledger.quantity(instrument)
+        row['avg_price'] = float(engine.ledger.avg_price(instrument))
+    
+    return {
+        **results,
+        'symbols': list(summary.values()),
+        'missing_symbols': [symbol for (symbol, exchange), arrays in series.items() if not len(arrays['datetime'])]
+    }
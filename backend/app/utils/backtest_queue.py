@@ -0,0 +1,171 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Any
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.backtest import BacktestRun
+from app.utils.backtest_engine import BacktestEngine
+
+class BacktestCancelled(Exception):
+    pass
+
+def transition_run(db: Session, run_id: int, expected: str, status: str, **values) -> bool:
+    """Move a run from ``expected`` to ``status`` in one conditional UPDATE (caller commits)
+    
+    Returns False when the run was no longer in ``expected``, e.g. because a
+    worker started it or a cancel request got there first.
+    """
+    result = db.execute(
+        update(BacktestRun)
+        .where(BacktestRun.id == run_id, BacktestRun.status == expected)
+        .values(status=status, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+class BacktestJobQueue:
+    """Bounded queue of backtest runs executed by a pool of worker threads
+    
+    Jobs are BacktestRun ids whose status moves pending -> running ->
+    completed / failed / cancelled. Finer progress (stage and fraction done) is
+    kept in memory while a job is queued or running. Cancellation of a running
+    job takes effect at the next stage boundary.
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._progress = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+    
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"backtest-worker-{len(self._threads) + 1}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def submit(self, run_id: int, config: Dict[str, Any]):
+        """Queue a run; raises queue.Full when max_pending runs are already waiting"""
+        self._start()
+        with self._lock:
+            self._progress[run_id] = {'stage': 'queued', 'progress': 0.0}
+        try:
+            self._queue.put_nowait((run_id, config))
+        except queue.Full:
+            with self._lock:
+                self._progress.pop(run_id, None)
+            raise
+    
+    def cancel(self, run_id: int) -> bool:
+        """Flag a queued or running job for cancellation; False if it is not in the queue"""
+        with self._lock:
+            if run_id not in self._progress:
+                return False
+            self._cancelled.add(run_id)
+            return True
+    
+    def progress(self, run_id: int):
+        with self._lock:
+            progress = self._progress.get(run_id)
+            return dict(progress) if progress else None
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'max_pending': self._queue.maxsize,
+                'active': sum(1 for progress in self._progress.values() if progress['stage'] != 'queued')
+            }
+    
+    def _stage(self, run_id: int, stage: str, progress: float):
+        with self._lock:
+            if run_id in self._cancelled:
+                raise BacktestCancelled()
+            self._progress[run_id] = {'stage': stage, 'progress': progress}
+    
+    def _work(self):
+        while True:
+            run_id, config = self._queue.get()
+            try:
+                self._run(run_id, config)
+            except Exception as e:
+                logging.error(f"Backtest worker error for run {run_id}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._progress.pop(run_id, None)
+                    self._cancelled.discard(run_id)
+                self._queue.task_done()
+    
+    def _run(self, run_id: int, config: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            # Claim the run; one cancelled (or already taken) meanwhile is skipped
+            claimed = transition_run(db, run_id, 'pending', 'running')
+            db.commit()
+            if not claimed:
+                return
+            backtest_run = db.get(BacktestRun, run_id)
+            
+            try:
+                self._stage(run_id, 'loading', 0.1)
+                
+                engine = BacktestEngine(db)
+                data = engine._get_historical_data(
+                    config['symbol'], config['exchange'], config['start_date'], config['end_date']
+                )
+                if data.empty:
+                    raise ValueError("No historical data found for the given parameters")
+                
+                self._stage(run_id, 'running', 0.4)
+                results = engine.run_strategy(
+                    data,
+                    config['strategy_name'],
+                    config.get('parameters', {}),
+                    config['initial_capital'],
+                    symbol=config['symbol'],
+                    lot_method=config.get('lot_method', 'fifo'),
+                    execution=config.get('execution')
+                )
+                
+                self._stage(run_id, 'saving', 0.9)
+                backtest_run.status = 'completed'
+                backtest_run.completed_at = datetime.now()
+                backtest_run.set_results(results)
+                engine.save_results(backtest_run, results)
+                db.commit()
+            
+            except BacktestCancelled:
+                db.rollback()
+                backtest_run.status = 'cancelled'
+                backtest_run.completed_at = datetime.now()
+                db.commit()
+            
+            except Exception as e:
+                db.rollback()
+                logging.error(f"Backtest error: {str(e)}")
+                backtest_run.status = 'failed'
+                backtest_run.completed_at = datetime.now()
+                backtest_run.set_results({'error': str(e)})
+                db.commit()
+        finally:
+            db.close()
+
+def fail_interrupted_runs(db: Session):
+    """Mark runs left pending/running by a previous process as failed"""
+    runs = db.query(BacktestRun).filter(BacktestRun.status.in_(('pending', 'running'))).all()
+    for backtest_run in runs:
+        backtest_run.status = 'failed'
+        backtest_run.set_results({'error': 'Interrupted by a server restart'})
+    db.commit()
+    return len(runs)
+
+# Create global backtest queue instance
+backtest_queue = BacktestJobQueue(settings.BACKTEST_WORKERS, settings.BACKTEST_QUEUE_SIZE)
@@ -0,0 +1,179 @@
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from app.utils.backtest_engine import BacktestEngine
+
+MAX_SWEEP_COMBINATIONS = 5000
+
+# Default number of values per swept parameter when only min/max are given
+DEFAULT_SWEEP_STEPS = 10
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+RANK_METRICS = ('total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'final_capital')
+
+def _parameter_values(name: str, spec: Dict[str, Any], requested) -> List[Any]:
+    """Expand one parameter's requested range into concrete values within its schema bounds"""
+    cast = int if spec['type'] == 'int' else float
+    
+    if requested is None:
+        return [spec['default']]
+    if isinstance(requested, list):
+        values = [cast(value) for value in requested]
+    elif isinstance(requested, dict):
+        low = cast(requested.get('min', spec['min']))
+        high = cast(requested.get('max', spec['max']))
+        step = requested.get('step')
+        if step is None:
+            step = max((high - low) / (DEFAULT_SWEEP_STEPS - 1), 1 if cast is int else 0)
+            step = cast(round(step)) if cast is int else step
+        if step <= 0:
+            raise ValueError(f"Step for {name} must be positive")
+        count = int(np.floor((high - low) / step + 1e-9)) + 1 if high >= low else 0
+        values = [cast(round(low + i * step, 10)) for i in range(count)]
+    else:
+        values = [cast(requested)]
+    
+    for value in values:
+        if value < spec['min'] or value > spec['max']:
+            raise ValueError(f"{name}={value} is outside [{spec['min']}, {spec['max']}]")
+    if not values:
+        raise ValueError(f"No values to sweep for {name}")
+    return list(dict.fromkeys(values))
+
+def is_valid_combination(strategy_name: str, params: Dict[str, Any]) -> bool:
+    if strategy_name == 'sma_crossover':
+        return params['short_window'] < params['long_window']
+    if strategy_name == 'rsi_strategy':
+        return params['oversold_threshold'] < params['overbought_threshold']
+    return True
+
+def parameter_grid(strategy_name: str, schema: Dict[str, Dict[str, Any]], ranges: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Build every valid parameter combination from per-parameter ranges
+    
+    Each range is a list of values, a {min, max, step} dict (bounds default to
+    the schema, step to DEFAULT_SWEEP_STEPS values) or a single fixed value.
+    Parameters that are not given stay at their schema default.
+    """
+    unknown = set(ranges or {}) - set(schema)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy_name}: {', '.join(sorted(unknown))}")
+    
+    names = list(schema)
+    axes = [_parameter_values(name, schema[name], (ranges or {}).get(name)) for name in names]
+    total = int(np.prod([len(axis) for axis in axes]))
+    if total > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(f"Sweep has {total} combinations; the limit is {MAX_SWEEP_COMBINATIONS}")
+    
+    grid = [dict(zip(names, values)) for values in itertools.product(*axes)]
+    return [params for params in grid if is_valid_combination(strategy_name, params)]
+
+# Per-worker state: the price frame rebuilt from shared memory once per process
+_worker_data = None
+_worker_shm = None
+
+def _frame_to_block(data: pd.DataFrame) -> np.ndarray:
+    """Pack timestamps and price columns into one float64 block, one row per column
+    
+    Timestamps are stored as the bit pattern of their datetime64[ns] values, so
+    they can be viewed back without conversion.
+    """
+    stamps = data.index.values.astype('datetime64[ns]').view(np.float64)
+    return np.vstack([stamps] + [data[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS])
+
+def _block_to_frame(block: np.ndarray) -> pd.DataFrame:
+    """Price frame whose index and columns are views of the block, without copying it"""
+    index = pd.DatetimeIndex(block[0].view('datetime64[ns]'), name='timestamp', copy=False)
+    # The transposed rows form the column-major 2D array pandas stores as one float block
+    return pd.DataFrame(block[1:].T, index=index, columns=list(PRICE_COLUMNS), copy=False)
+
+def _init_worker(shm_name: str, shape):
+    global _worker_data, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_data = _block_to_frame(block)
+
+def evaluate_parameters(data: pd.DataFrame, strategy_name: str, params: Dict[str, Any], initial_capital: float) -> Dict[str, Any]:
+    """Metrics of one strategy run; errors are reported in the row instead of raised"""
+    try:
+        metrics = BacktestEngine(None).run_strategy(
+            data, strategy_name, params, initial_capital, include_details=False
+        )
+        return {'parameters': params, **{key: float(value) if isinstance(value, np.floating) else value for key, value in metrics.items()}}
+    except Exception as e:
+        return {'parameters': params, 'error': str(e)}
+
+def _call_in_worker(task):
+    func, args = task
+    return func(_worker_data, *args)
+
+def check_rank_metric(sort_by: str):
+    if sort_by not in RANK_METRICS:
+        raise ValueError(f"Cannot rank by {sort_by}; choose one of {', '.join(RANK_METRICS)}")
+
+def rank_results(results: List[Dict[str, Any]], sort_by: str) -> List[Dict[str, Any]]:
+    """Order rows best-first by a metric (max_drawdown is negative, so higher is better too)"""
+    check_rank_metric(sort_by)
+    ranked = sorted(
+        results,
+        key=lambda row: (('error' not in row), row.get(sort_by, float('-inf'))),
+        reverse=True
+    )
+    for rank, row in enumerate(ranked, start=1):
+        row['rank'] = rank
+    return ranked
+
+def map_shared(data: pd.DataFrame, func, tasks: List[tuple], max_workers: int = None, on_result=None) -> List[Any]:
+    """Call ``func(data, *args)`` for every task tuple, in parallel over one price frame
+    
+    Prices are placed in a shared-memory block that worker processes map
+    read-only, so the data is loaded and copied once rather than per task.
+    ``func`` must be a module-level function. Single-worker maps run in-process.
+    ``on_result`` is called with the number of finished tasks as results
+    arrive, in task order.
+    """
+    results = []
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    if max_workers == 1:
+        for args in tasks:
+            results.append(func(data, *args))
+            if on_result:
+                on_result(len(results))
+        return results
+    
+    block = _frame_to_block(data)
+    shm = shared_memory.SharedMemory(create=True, size=block.nbytes)
+    try:
+        np.ndarray(block.shape, dtype=np.float64, buffer=shm.buf)[:] = block
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(shm.name, block.shape)) as pool:
+            for result in pool.map(
+                _call_in_worker,
+                [(func, args) for args in tasks],
+                chunksize=max(1, len(tasks) // (max_workers * 4))
+            ):
+                results.append(result)
+                if on_result:
+                    on_result(len(results))
+        logging.info(f"Ran {len(tasks)} {func.__name__} tasks on {max_workers} workers in {time.perf_counter() - started:.2f}s")
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+def run_sweep(data: pd.DataFrame, strategy_name: str, grid: List[Dict[str, Any]], initial_capital: float,
+              max_workers: int = None, on_result=None) -> List[Dict[str, Any]]:
+    """Evaluate every parameter combination over one loaded price frame"""
+    return map_shared(
+        data,
+        evaluate_parameters,
+        [(strategy_name, params, initial_capital) for params in grid],
+        max_workers,
+        on_result
+    )
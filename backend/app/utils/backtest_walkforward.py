@@ -0,0 +1,138 @@
+from datetime import timedelta
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from app.utils.backtest_engine import BacktestEngine
+from app.utils.backtest_sweep import evaluate_parameters, rank_results, map_shared, MAX_SWEEP_COMBINATIONS
+
+MAX_WALK_FORWARD_WINDOWS = 100
+
+def walk_forward_windows(index: pd.DatetimeIndex, train_days: int, test_days: int) -> List[Dict[str, int]]:
+    """Bar positions of rolling train/test windows over a price index
+    
+    Windows are measured in calendar days and roll forward by one test period,
+    so test periods are back to back. The last test period may be shorter.
+    Windows whose train or test period holds no bars (e.g. a test period
+    falling in a market holiday gap) are skipped.
+    """
+    if train_days < 1 or test_days < 1:
+        raise ValueError("train_days and test_days must be positive")
+    if len(index) == 0:
+        return []
+    
+    windows = []
+    train_start = index[0]
+    while True:
+        train_end = train_start + timedelta(days=train_days)
+        test_end = train_end + timedelta(days=test_days)
+        train_lo, train_hi, test_hi = index.searchsorted([train_start, train_end, test_end])
+        if train_hi >= len(index):
+            break
+        if train_hi > train_lo and test_hi > train_hi:
+            windows.append({'train_start': int(train_lo), 'test_start': int(train_hi), 'test_end': int(test_hi)})
+        train_start += timedelta(days=test_days)
+    return windows
+
+def _equity_metrics(values: np.ndarray, initial_capital: float) -> Dict[str, Any]:
+    """Return, drawdown and Sharpe of an equity curve, as in BacktestEngine results"""
+    if len(values) == 0:
+        return {'total_return': 0, 'max_drawdown': 0, 'sharpe_ratio': 0, 'final_capital': initial_capital}
+    peak = np.maximum.accumulate(values)
+    returns = np.diff(values) / values[:-1]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0
+    return {
+        'total_return': round(float((values[-1] - initial_capital) / initial_capital * 100), 2),
+        'max_drawdown': round(float(((values - peak) / peak).min() * 100), 2),
+        'sharpe_ratio': round(float(returns.mean() / std * np.sqrt(252)), 2) if std > 0 else 0,
+        'final_capital': float(values[-1])
+    }
+
+def evaluate_window(data: pd.DataFrame, strategy_name: str, grid: List[Dict[str, Any]], window: Dict[str, int],
+                    initial_capital: float, sort_by: str) -> Dict[str, Any]:
+    """Optimize on one train window and run the best parameters on its test window
+    
+    The test run is primed with the train bars so indicators start warm, but
+    only test bars are traded and reported.
+    """
+    train = data.iloc[window['train_start']:window['test_start']]
+    ranked = rank_results(
+        [evaluate_parameters(train, strategy_name, params, initial_capital) for params in grid],
+        sort_by
+    )
+    best = ranked[0] if ranked and 'error' not in ranked[0] else None
+    
+    summary = {
+        'train_start': train.index[0].isoformat(),
+        'train_end': train.index[-1].isoformat(),
+        'test_start': data.index[window['test_start']].isoformat(),
+        'test_end': data.index[window['test_end'] - 1].isoformat(),
+        'train_bars': len(train),
+        'test_bars': window['test_end'] - window['test_start'],
+        'parameters': best['parameters'] if best else None,
+        'in_sample': {key: value for key, value in best.items() if key not in ('parameters', 'rank')} if best else None
+    }
+    if best is None:
+        return {**summary, 'error': ranked[0]['error'] if ranked else "No valid parameter combinations"}
+    
+    engine = BacktestEngine(None)
+    metrics = engine.run_strategy(
+        data.iloc[window['train_start']:window['test_end']],
+        strategy_name,
+        best['parameters'],
+        initial_capital,
+        include_details=False,
+        warmup_bars=len(train)
+    )
+    return {
+        **summary,
+        'out_of_sample': {key: float(value) if isinstance(value, np.floating) else value for key, value in metrics.items()},
+        'timestamps': engine.portfolio_value['timestamp'],
+        'values': engine.portfolio_value['value']
+    }
+
+def run_walk_forward(data: pd.DataFrame, strategy_name: str, grid: List[Dict[str, Any]], initial_capital: float,
+                     train_days: int, test_days: int, sort_by: str = 'sharpe_ratio', max_workers: int = None) -> Dict[str, Any]:
+    """Walk-forward optimization with windows evaluated in parallel
+    
+    Each test period starts from ``initial_capital``; the stitched equity
+    compounds them, scaling every period by the capital the previous one
+    ended with.
+    """
+    windows = walk_forward_windows(data.index, train_days, test_days)
+    if not windows:
+        raise ValueError("Date range is too short for one train and test window")
+    if len(windows) > MAX_WALK_FORWARD_WINDOWS:
+        raise ValueError(f"Walk-forward has {len(windows)} windows; the limit is {MAX_WALK_FORWARD_WINDOWS}")
+    if len(windows) * len(grid) > MAX_SWEEP_COMBINATIONS * 10:
+        raise ValueError("Too many windows x parameter combinations; narrow the ranges or lengthen the test period")
+    
+    results = map_shared(
+        data,
+        evaluate_window,
+        [(strategy_name, grid, window, initial_capital, sort_by) for window in windows],
+        max_workers
+    )
+    
+    capital = initial_capital
+    timestamps = []
+    values = []
+    for number, result in enumerate(results, start=1):
+        result['window'] = number
+        if 'values' not in result:
+            continue
+        scaled = result.pop('values') * (capital / initial_capital)
+        timestamps.append(result.pop('timestamps'))
+        values.append(scaled)
+        if len(scaled):
+            capital = float(scaled[-1])
+    
+    timestamps = np.concatenate(timestamps) if timestamps else np.array([], dtype='datetime64[s]')
+    values = np.concatenate(values) if values else np.array([], dtype=np.float64)
+    return {
+        'windows': results,
+        'out_of_sample': _equity_metrics(values, initial_capital),
+        'equity': [
+            {'timestamp': timestamp, 'value': value}
+            for timestamp, value in zip(np.datetime_as_string(timestamps, unit='s').tolist(), values.tolist())
+        ]
+    }
@@ -0,0 +1,132 @@
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.utils.ingest import bulk_upsert_bars
+from app.utils.market_calendar import IST, MARKET_OPEN, MARKET_CLOSE, is_trading_day
+
+LIVE_INTERVAL = '1m'
+
+class LiveBarBuilder:
+    """Build 1-minute candles from polled LTP/volume quote snapshots
+    
+    Each snapshot updates the in-progress bar of its (symbol, exchange) for the
+    minute it was received in (IST). Quotes carry cumulative day volume, so a
+    bar's volume is the increase over the previous snapshot. Bars are completed
+    when a later minute starts and queued until flush() upserts them in batches.
+    """
+    
+    def __init__(self):
+        self._bars = {}
+        self._last_volume = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _minute(now):
+        now = now.astimezone(IST) if now.tzinfo else IST.localize(now)
+        return now.replace(second=0, microsecond=0, tzinfo=None)
+    
+    def _complete(self, key):
+        bar = self._bars.pop(key)
+        self._pending.setdefault(key, []).append(bar)
+    
+    def update(self, quotes, now: datetime = None):
+        """Apply a batch of quotes from fetch_realtime_quotes; returns bars updated"""
+        minute = self._minute(now or datetime.now(IST))
+        if not is_trading_day(minute.date()) or not MARKET_OPEN <= minute.time() < MARKET_CLOSE:
+            return 0
+        
+        updated = 0
+        with self._lock:
+            for quote in quotes:
+                ltp = quote.get('ltp')
+                if 'error' in quote or not ltp:
+                    continue
+                
+                key = (quote['symbol'], quote['exchange'])
+                day_volume = int(quote.get('volume') or 0)
+                last_day, last_volume = self._last_volume.get(key, (None, day_volume))
+                volume = max(day_volume - last_volume, 0) if last_day == minute.date() else 0
+                self._last_volume[key] = (minute.date(), day_volume)
+                
+                bar = self._bars.get(key)
+                if bar is not None and bar['minute'] != minute:
+                    self._complete(key)
+                    bar = None
+                
+                if bar is None:
+                    self._bars[key] = {
+                        'minute': minute,
+                        'open': ltp,
+                        'high': ltp,
+                        'low': ltp,
+                        'close': ltp,
+                        'volume': volume
+                    }
+                else:
+                    bar['high'] = max(bar['high'], ltp)
+                    bar['low'] = min(bar['low'], ltp)
+                    bar['close'] = ltp
+                    bar['volume'] += volume
+                updated += 1
+        
+        return updated
+    
+    def close_stale(self, now: datetime = None):
+        """Complete in-progress bars whose minute has passed (e.g. after the close)"""
+        minute = self._minute(now or datetime.now(IST))
+        with self._lock:
+            for key in [key for key, bar in self._bars.items() if bar['minute'] < minute]:
+                self._complete(key)
+    
+    def in_progress(self):
+        """Snapshot of the bars still being built"""
+        with self._lock:
+            return [
+                {'symbol': symbol, 'exchange': exchange, **bar}
+                for (symbol, exchange), bar in self._bars.items()
+            ]
+    
+    def flush(self, db: Session, now: datetime = None, include_open: bool = False):
+        """Upsert completed bars into stock_data and commit; returns bars written
+        
+        With ``include_open`` (at shutdown) the in-progress bars are completed and
+        written too, holding the quotes seen so far in their minute.
+        """
+        if include_open:
+            with self._lock:
+                for key in list(self._bars):
+                    self._complete(key)
+        else:
+            self.close_stale(now)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        
+        written = 0
+        for (symbol, exchange), bars in pending.items():
+            try:
+                count = bulk_upsert_bars(db, symbol, exchange, LIVE_INTERVAL, [
+                    {
+                        'date': bar['minute'].date(),
+                        'time': bar['minute'].time(),
+                        'open': bar['open'],
+                        'high': bar['high'],
+                        'low': bar['low'],
+                        'close': bar['close'],
+                        'volume': bar['volume']
+                    } for bar in bars
+                ])
+                db.commit()
+                written += count
+            except Exception as e:
+                db.rollback()
+                logging.error(f"Failed to flush live bars for {symbol}: {str(e)}")
+                # Keep the bars for the next flush
+                with self._lock:
+                    self._pending.setdefault((symbol, exchange), [])[:0] = bars
+        
+        return written
+
+# Create global live bar builder instance
+bar_builder = LiveBarBuilder()
@@ -0,0 +1,129 @@
+import io
+import logging
+import pandas as pd
+from sqlalchemy import select
+from app.database.database import engine
+from app.models.stock_data import StockData
+from app.utils.bulk_import import DEFAULT_CHUNK_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    PYARROW_AVAILABLE = False
+    logging.warning(f'PyArrow import error, Parquet/Arrow export disabled: {str(e)}')
+
+EXPORT_COLUMNS = ['symbol', 'exchange', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+EXPORT_FORMATS = {
+    'csv': {'media_type': 'text/csv', 'extension': 'csv'},
+    'parquet': {'media_type': 'application/vnd.apache.parquet', 'extension': 'parquet'},
+    'arrow': {'media_type': 'application/vnd.apache.arrow.stream', 'extension': 'arrows'}
+}
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands buffered bytes to a streaming generator"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def validate_format(export_format: str) -> str:
+    """Check that an export format is known and its dependencies are installed"""
+    export_format = export_format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format != 'csv' and not PYARROW_AVAILABLE:
+        raise ValueError(f"{export_format} export requires the pyarrow package")
+    return export_format
+
+def _export_query(symbols, exchange, start_date, end_date):
+    query = select(
+        StockData.symbol, StockData.exchange, StockData.date, StockData.time,
+        StockData.open, StockData.high, StockData.low, StockData.close, StockData.volume
+    ).where(
+        StockData.exchange == exchange,
+        StockData.date >= start_date,
+        StockData.date <= end_date
+    )
+    if symbols:
+        query = query.where(StockData.symbol.in_(symbols))
+    return query.order_by(StockData.symbol, StockData.date, StockData.time)
+
+def iter_frames(symbols, exchange, start_date, end_date, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most chunk_size rows from a server-side cursor"""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            _export_query(symbols, exchange, start_date, end_date)
+        )
+        for rows in result.partitions():
+            frame = pd.DataFrame(
+                rows,
+                columns=['symbol', 'exchange', 'date', 'time', 'open', 'high', 'low', 'close', 'volume']
+            )
+            frame['timestamp'] = pd.to_datetime(frame['date'].astype(str) + ' ' + frame['time'].astype(str))
+            yield frame[EXPORT_COLUMNS]
+
+def _arrow_schema():
+    return pa.schema([
+        ('symbol', pa.string()),
+        ('exchange', pa.string()),
+        ('timestamp', pa.timestamp('s')),
+        ('open', pa.float64()),
+        ('high', pa.float64()),
+        ('low', pa.float64()),
+        ('close', pa.float64()),
+        ('volume', pa.int64())
+    ])
+
+def stream_export(symbols, exchange, start_date, end_date, export_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield the encoded export chunk by chunk in the requested format"""
+    frames = iter_frames(symbols, exchange, start_date, end_date, chunk_size)
+    
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        buffer.write(','.join(EXPORT_COLUMNS) + '\n')
+        for frame in frames:
+            frame.to_csv(buffer, header=False, index=False, date_format='%Y-%m-%dT%H:%M:%S')
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+    
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,167 @@
+import logging
+import time
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.utils.ingest import bulk_upsert_bars
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    PYARROW_AVAILABLE = False
+    logging.warning(f'PyArrow import error, Parquet support disabled: {str(e)}')
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Upsert key of a stored bar; a chunk may hold each key only once
+BAR_KEY = ['symbol', 'exchange', 'date', 'time']
+
+# Vendor column names mapped onto StockData fields
+COLUMN_ALIASES = {
+    'datetime': 'timestamp',
+    'date_time': 'timestamp',
+    'ts': 'timestamp',
+    'o': 'open',
+    'h': 'high',
+    'l': 'low',
+    'c': 'close',
+    'v': 'volume',
+    'vol': 'volume',
+    'ticker': 'symbol',
+    'tradingsymbol': 'symbol'
+}
+
+class PartialImportError(Exception):
+    """An import failed after earlier chunks had been committed"""
+    
+    def __init__(self, error: Exception, rows: int, chunks: int):
+        super().__init__(f"{error} ({rows} rows in {chunks} chunks were already committed)")
+        self.error = error
+        self.rows = rows
+        self.chunks = chunks
+
+def detect_format(filename: str, file_format: str = None) -> str:
+    """Resolve the import format from an explicit value or the file extension"""
+    if file_format:
+        file_format = file_format.lower()
+    elif filename and filename.lower().endswith(('.parquet', '.pq')):
+        file_format = 'parquet'
+    else:
+        file_format = 'csv'
+    
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported import format: {file_format}")
+    if file_format == 'parquet' and not PYARROW_AVAILABLE:
+        raise ValueError("Parquet import requires the pyarrow package")
+    return file_format
+
+def iter_raw_chunks(file, file_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield raw DataFrame chunks from a CSV or Parquet file object"""
+    if file_format == 'parquet':
+        parquet_file = pq.ParquetFile(file)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(file, chunksize=chunk_size):
+            yield chunk
+
+def normalize_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Map vendor columns onto date/time/open/high/low/close/volume (+ optional symbol/exchange)"""
+    chunk = chunk.rename(columns=lambda c: str(c).strip().lower())
+    chunk = chunk.rename(columns=COLUMN_ALIASES)
+    
+    missing = [col for col in ('open', 'high', 'low', 'close') if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    
+    # Unparseable timestamps become NaT and their rows are dropped
+    if 'timestamp' in chunk.columns:
+        timestamps = pd.to_datetime(chunk['timestamp'], errors='coerce')
+    elif 'date' in chunk.columns:
+        if 'time' in chunk.columns:
+            timestamps = pd.to_datetime(chunk['date'].astype(str) + ' ' + chunk['time'].astype(str), errors='coerce')
+        else:
+            timestamps = pd.to_datetime(chunk['date'], errors='coerce')
+    else:
+        raise ValueError("Missing required column: timestamp (or date/time)")
+    chunk = chunk[timestamps.notna()]
+    timestamps = timestamps[timestamps.notna()]
+    
+    # Stored bars are naive IST
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+    
+    normalized = pd.DataFrame({
+        'date': timestamps.dt.date,
+        'time': timestamps.dt.time,
+        'open': chunk['open'].astype(float),
+        'high': chunk['high'].astype(float),
+        'low': chunk['low'].astype(float),
+        'close': chunk['close'].astype(float),
+        'volume': chunk['volume'].fillna(0).astype('int64') if 'volume' in chunk.columns else 0
+    })
+    for col in ('symbol', 'exchange'):
+        if col in chunk.columns:
+            normalized[col] = chunk[col].astype(str).str.strip().str.upper()
+    
+    return normalized.dropna(subset=['open', 'high', 'low', 'close'])
+
+def import_bars(
+    db: Session,
+    file,
+    file_format: str,
+    symbol: str = None,
+    exchange: str = 'NSE',
+    interval: str = 'D',
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    """Stream a CSV/Parquet file into stock_data chunk by chunk, committing each chunk
+    
+    Within a chunk the last row for a (symbol, exchange, date, time) key wins.
+    Errors after the first commit are raised as PartialImportError carrying the
+    committed row and chunk counts.
+    """
+    started = time.perf_counter()
+    total_rows = 0
+    chunks = 0
+    symbols = set()
+    
+    try:
+        for raw_chunk in iter_raw_chunks(file, file_format, chunk_size):
+            chunk = normalize_chunk(raw_chunk)
+            if chunk.empty:
+                continue
+            
+            if 'symbol' not in chunk.columns:
+                if not symbol:
+                    raise ValueError("File has no symbol column; pass the symbol parameter")
+                chunk['symbol'] = symbol.upper()
+            if 'exchange' not in chunk.columns:
+                chunk['exchange'] = exchange
+            chunk = chunk.drop_duplicates(subset=BAR_KEY, keep='last')
+            
+            chunk_rows = 0
+            for (chunk_symbol, chunk_exchange), group in chunk.groupby(['symbol', 'exchange'], sort=False):
+                chunk_rows += bulk_upsert_bars(
+                    db, chunk_symbol, chunk_exchange, interval,
+                    group.drop(columns=['symbol', 'exchange']).to_dict('records')
+                )
+                symbols.add(chunk_symbol)
+            
+            db.commit()
+            total_rows += chunk_rows
+            chunks += 1
+            logging.info(f"Imported chunk {chunks} ({total_rows} rows so far)")
+    except Exception as e:
+        if chunks:
+            raise PartialImportError(e, total_rows, chunks) from e
+        raise
+    
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': total_rows,
+        'chunks': chunks,
+        'symbols': sorted(symbols),
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(total_rows / elapsed, 1) if elapsed > 0 else 0
+    }
@@ -0,0 +1,38 @@
+import numpy as np
+
+def align_series(series, fields=('close',)):
+    """Align per-symbol bar columns on the union of their timestamps
+    
+    Returns (datetimes, {symbol: {field: values}}) where each field is a float
+    array over the common index with NaN where a symbol has no bar.
+    """
+    datetimes = np.array([], dtype='datetime64[s]')
+    for arrays in series.values():
+        datetimes = np.union1d(datetimes, arrays['datetime'])
+    
+    aligned = {}
+    for symbol, arrays in series.items():
+        positions = np.searchsorted(datetimes, arrays['datetime'])
+        aligned[symbol] = {}
+        for field in fields:
+            values = np.full(len(datetimes), np.nan)
+            values[positions] = arrays[field]
+            aligned[symbol][field] = values
+    return datetimes, aligned
+
+def normalize_to(datetimes, aligned, base, price_fields=('open', 'high', 'low', 'close')):
+    """Rebase price fields so each symbol's first close on or after ``base`` is 100
+    
+    Symbols without a close on or after the base are left as NaN.
+    """
+    start = np.searchsorted(datetimes, np.datetime64(base, 's'))
+    for fields in aligned.values():
+        closes = fields.get('close')
+        if closes is None:
+            raise ValueError("Normalization requires the close field")
+        defined = np.flatnonzero(~np.isnan(closes[start:]))
+        base_close = closes[start + defined[0]] if len(defined) else np.nan
+        for field, values in fields.items():
+            if field in price_fields:
+                fields[field] = values / base_close * 100
+    return aligned
@@ -0,0 +1,45 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+def make_etag(version: int, *parts) -> str:
+    """Strong ETag from a data version and the request parameters shaping the body"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+def _http_date(last_modified):
+    if last_modified is None:
+        return None
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+def cache_headers(etag: str, last_modified=None) -> dict:
+    """Validator headers for a cacheable response"""
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+    http_date = _http_date(last_modified)
+    if http_date:
+        headers['Last-Modified'] = http_date
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified=None) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current validators"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in candidates or any(tag.removeprefix('W/') == etag for tag in candidates)
+    
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified_response(etag: str, last_modified=None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
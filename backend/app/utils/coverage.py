@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.data_coverage import DataCoverage
+from app.models.stock_data import StockData
+from app.utils.market_calendar import (
+    market_holidays, next_trading_day, count_trading_days, roll_forward, roll_backward
+)
+
+def _ranges_from_dates(dates):
+    """Collapse a collection of dates into contiguous trading-day ranges"""
+    if len(dates) == 0:
+        return []
+    
+    days = np.unique(np.array(list(dates), dtype='datetime64[D]'))
+    next_days = np.busday_offset(days + 1, 0, roll='forward', holidays=market_holidays())
+    
+    # A new range starts wherever a date lies beyond the previous date's next trading day
+    breaks = np.flatnonzero(days[1:] > next_days[:-1]) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks - 1, [len(days) - 1]))
+    
+    return [
+        (days[s].astype(date), days[e].astype(date))
+        for s, e in zip(starts, ends)
+    ]
+
+def _merge_ranges(ranges):
+    """Merge overlapping or trading-day-adjacent ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= next_trading_day(merged[-1][1]):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def get_coverage(db: Session, symbol: str, exchange: str, interval: str):
+    """Get stored coverage ranges ordered by start date"""
+    return db.query(DataCoverage).filter(
+        DataCoverage.symbol == symbol,
+        DataCoverage.exchange == exchange,
+        DataCoverage.interval == interval
+    ).order_by(DataCoverage.start_date).all()
+
+def record_coverage(db: Session, symbol: str, exchange: str, interval: str, dates):
+    """Merge newly stored dates into the coverage index (caller commits)"""
+    new_ranges = _ranges_from_dates(dates)
+    if not new_ranges:
+        return
+    
+    existing = get_coverage(db, symbol, exchange, interval)
+    current = [(row.start_date, row.end_date) for row in existing]
+    merged = _merge_ranges(current + new_ranges)
+    
+    if merged == current:
+        return
+    
+    for row in existing:
+        db.delete(row)
+    for start, end in merged:
+        db.add(DataCoverage(
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            start_date=start,
+            end_date=end
+        ))
+
+def find_gaps(db: Session, symbol: str, exchange: str, interval: str, start_date: date, end_date: date):
+    """Find trading-day ranges within [start_date, end_date] missing from the coverage index"""
+    ranges = db.query(DataCoverage).filter(
+        DataCoverage.symbol == symbol,
+        DataCoverage.exchange == exchange,
+        DataCoverage.interval == interval,
+        DataCoverage.end_date >= start_date,
+        DataCoverage.start_date <= end_date
+    ).order_by(DataCoverage.start_date).all()
+    
+    gaps = []
+    
+    def add_gap(gap_start, gap_end):
+        days = count_trading_days(gap_start, gap_end)
+        if days == 0:
+            return
+        gaps.append({
+            'start_date': roll_forward(gap_start),
+            'end_date': roll_backward(gap_end),
+            'trading_days': days
+        })
+    
+    cursor = start_date
+    for row in ranges:
+        if row.start_date > cursor:
+            add_gap(cursor, min(row.start_date - timedelta(days=1), end_date))
+        cursor = max(cursor, next_trading_day(row.end_date))
+    
+    if cursor <= end_date:
+        add_gap(cursor, end_date)
+    
+    return gaps
+
+def rebuild_coverage(db: Session, symbol: str, exchange: str, interval: str):
+    """Rebuild the coverage index for a key from the stored bars (caller commits)"""
+    dates = [
+        row[0] for row in db.query(StockData.date).filter(
+            StockData.symbol == symbol,
+            StockData.exchange == exchange
+        ).distinct().all()
+    ]
+    
+    db.query(DataCoverage).filter(
+        DataCoverage.symbol == symbol,
+        DataCoverage.exchange == exchange,
+        DataCoverage.interval == interval
+    ).delete()
+    
+    for start, end in _ranges_from_dates(dates):
+        db.add(DataCoverage(
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            start_date=start,
+            end_date=end
+        ))
@@ -0,0 +1,49 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.database import dialect_insert
+from app.models.data_version import DataVersion
+
+def bump_data_version(db: Session, symbol: str, exchange: str, interval: str):
+    """Increment the data version for a key (caller commits)"""
+    stmt = dialect_insert(db, DataVersion.__table__).values(
+        symbol=symbol,
+        exchange=exchange,
+        interval=interval,
+        version=1,
+        updated_at=func.now()
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['symbol', 'exchange', 'interval'],
+        set_={
+            'version': DataVersion.__table__.c.version + 1,
+            'updated_at': func.now()
+        }
+    ))
+
+def get_data_version(db: Session, symbol: str, exchange: str):
+    """Get (version, last_modified) for a symbol across all ingested intervals
+    
+    Bars of every interval share the stock_data table, so reads depend on the
+    combined version of all intervals for the symbol.
+    """
+    version, last_modified = db.query(
+        func.coalesce(func.sum(DataVersion.version), 0),
+        func.max(DataVersion.updated_at)
+    ).filter(
+        DataVersion.symbol == symbol,
+        DataVersion.exchange == exchange
+    ).one()
+    return int(version), last_modified
+
+def get_data_versions(db: Session, symbols, exchange: str):
+    """Combined data version of several symbols in one query; {symbol: version}"""
+    rows = db.query(
+        DataVersion.symbol,
+        func.sum(DataVersion.version)
+    ).filter(
+        DataVersion.symbol.in_(symbols),
+        DataVersion.exchange == exchange
+    ).group_by(DataVersion.symbol).all()
+    versions = {symbol: 0 for symbol in symbols}
+    versions.update({symbol: int(version) for symbol, version in rows})
+    return versions
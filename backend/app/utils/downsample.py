@@ -0,0 +1,76 @@
+import numpy as np
+
+def bucket_starts(n: int, max_points: int) -> np.ndarray:
+    """Start offsets of max_points near-equal contiguous buckets over n bars"""
+    return (np.arange(max_points, dtype=np.int64) * n) // max_points
+
+def ohlc_buckets(columns, max_points: int):
+    """Aggregate bars into at most max_points OHLC candles
+    
+    Each bucket keeps the first open, highest high, lowest low, last close and total
+    volume, so wicks and gaps survive downsampling. Returns (columns, representative
+    indices) where the representative index of a bucket is its last bar.
+    """
+    n = len(columns['close'])
+    starts = bucket_starts(n, max_points)
+    ends = np.append(starts[1:] - 1, n - 1)
+    
+    sampled = {
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends],
+        'volume': np.add.reduceat(columns['volume'], starts)
+    }
+    for key, values in columns.items():
+        if key not in sampled:
+            sampled[key] = values[starts]
+    return sampled, ends
+
+def lttb_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets point selection over an evenly spaced series"""
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    
+    x = np.arange(n, dtype=np.float64)
+    every = (n - 2) / (max_points - 2)
+    edges = (np.arange(max_points - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return selected
+
+def downsample(columns, max_points: int, method: str = 'ohlc'):
+    """Reduce OHLCV columns to at most max_points bars
+    
+    Returns (columns, representative indices) so callers can sample any derived
+    per-bar series (indicators, timestamps) consistently with the candles.
+    """
+    n = len(columns['close'])
+    if not max_points or n <= max_points:
+        return columns, np.arange(n)
+    
+    if method == 'lttb':
+        indices = lttb_indices(np.asarray(columns['close'], dtype=np.float64), max_points)
+        return {key: values[indices] for key, values in columns.items()}, indices
+    elif method == 'ohlc':
+        return ohlc_buckets(columns, max_points)
+    else:
+        raise ValueError(f"Unknown downsample method: {method}")
@@ -0,0 +1,110 @@
+from typing import Dict, Any, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+ORDER_TYPES = ('market', 'limit', 'stop')
+
+# First window of bars scanned for an order's trigger; doubled until it is found
+FILL_SCAN_BLOCK = 256
+
+class BarEvents(NamedTuple):
+    """Bars as contiguous float64/datetime64 columns, one event per bar"""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+def bar_events(data: pd.DataFrame) -> BarEvents:
+    return BarEvents(
+        data.index.values,
+        *(np.ascontiguousarray(data[field].to_numpy(dtype=np.float64)) for field in ('open', 'high', 'low', 'close'))
+    )
+
+def _no_slippage(side: str, price: float, quantity: int, params: Dict[str, Any]) -> float:
+    return price
+
+def _bps_slippage(side: str, price: float, quantity: int, params: Dict[str, Any]) -> float:
+    shift = price * params.get('bps', 5) / 10000
+    return price + shift if side == 'BUY' else price - shift
+
+def _fixed_slippage(side: str, price: float, quantity: int, params: Dict[str, Any]) -> float:
+    shift = params.get('amount', 0.05)
+    return price + shift if side == 'BUY' else price - shift
+
+# Adverse price adjustment of market and stop fills
+SLIPPAGE_MODELS = {
+    'none': _no_slippage,
+    'bps': _bps_slippage,  # bps: basis points of the fill price
+    'fixed': _fixed_slippage  # amount: price units per share
+}
+
+def _percent_commission(value: float, quantity: int, params: Dict[str, Any]) -> float:
+    return value * params.get('rate', 0.001)
+
+def _per_share_commission(value: float, quantity: int, params: Dict[str, Any]) -> float:
+    return max(quantity * params.get('rate', 0.01), params.get('minimum', 0.0))
+
+def _flat_commission(value: float, quantity: int, params: Dict[str, Any]) -> float:
+    return params.get('amount', 20.0)
+
+COMMISSION_MODELS = {
+    'percent': _percent_commission,  # rate: fraction of traded value
+    'per_share': _per_share_commission,  # rate per share, with an optional minimum per order
+    'flat': _flat_commission  # amount per order
+}
+
+def check_execution(execution: Dict[str, Any]):
+    """Raise ValueError for an unknown order type or cost model"""
+    if execution.get('order_type', 'market') not in ORDER_TYPES:
+        raise ValueError(f"order_type must be one of {', '.join(ORDER_TYPES)}")
+    if (execution.get('slippage') or {}).get('model', 'none') not in SLIPPAGE_MODELS:
+        raise ValueError(f"Slippage model must be one of {', '.join(SLIPPAGE_MODELS)}")
+    if (execution.get('commission') or {}).get('model', 'percent') not in COMMISSION_MODELS:
+        raise ValueError(f"Commission model must be one of {', '.join(COMMISSION_MODELS)}")
+    if execution.get('valid_bars') is not None and execution['valid_bars'] < 1:
+        raise ValueError("valid_bars must be at least 1")
+
+def order_price(order_type: str, side: str, reference: float, limit_offset: float, stop_offset: float) -> Optional[float]:
+    """Trigger price of an order placed at ``reference`` (None for market orders)
+    
+    Limits rest below the reference for buys and above it for sells; stops sit
+    on the other side, so a buy stop fires on a breakout and a sell stop on a drop.
+    """
+    if order_type == 'limit':
+        return reference * (1 - limit_offset) if side == 'BUY' else reference * (1 + limit_offset)
+    if order_type == 'stop':
+        return reference * (1 + stop_offset) if side == 'BUY' else reference * (1 - stop_offset)
+    return None
+
+def find_fill(events: BarEvents, order_type: str, side: str, price: Optional[float], start: int, end: int):
+    """First bar in [start, end) where an order triggers, and its fill price before slippage
+    
+    Market orders fill at the open of ``start``. A buy limit triggers when the
+    low reaches the limit and a buy stop when the high reaches the stop (mirrored
+    for sells); a bar gapping through the price fills at its open. The bars are
+    scanned with vectorized comparisons over doubling windows, so the cost
+    depends on how long the order waits, not on per-bar Python work. Returns
+    (None, None) when the order does not trigger.
+    """
+    if start >= end:
+        return None, None
+    if order_type == 'market':
+        return start, float(events.open[start])
+    
+    # Buy limits and sell stops trigger on the low, the others on the high
+    on_low = (order_type == 'limit') == (side == 'BUY')
+    touch = events.low if on_low else events.high
+    block = FILL_SCAN_BLOCK
+    lo = start
+    while lo < end:
+        hi = min(end, lo + block)
+        window = touch[lo:hi] <= price if on_low else touch[lo:hi] >= price
+        k = int(window.argmax())
+        if window[k]:
+            j = lo + k
+            bar_open = float(events.open[j])
+            return j, min(bar_open, price) if on_low else max(bar_open, price)
+        lo = hi
+        block *= 2
+    return None, None
@@ -0,0 +1,240 @@
+import logging
+import threading
+from datetime import datetime, time, timedelta
+import numpy as np
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.stock_data import StockData
+from app.models.watchlist import WatchlistItem
+from app.utils.lru import LRUCache
+from app.utils.ohlcv import rows_to_arrays, stored_bar_filter, OHLCV_FIELDS, DAILY_STORED_INTERVALS
+
+COLUMNS = ('datetime',) + OHLCV_FIELDS
+
+# stock_data only tells daily (midnight) rows from intraday ones, so buffers are kept per kind
+BUFFER_KINDS = ('D', 'intraday')
+
+def buffer_kind(interval: str) -> str:
+    return 'D' if interval in DAILY_STORED_INTERVALS else 'intraday'
+
+class RingBuffer:
+    """Fixed-capacity NumPy ring of the latest bars for one (symbol, exchange, interval)
+    
+    ``complete`` is True while the buffer holds every stored bar, in which case
+    reads of any range can be served from it.
+    """
+    
+    def __init__(self, capacity: int, complete: bool = False):
+        self.capacity = capacity
+        self.complete = complete
+        self._columns = {
+            'datetime': np.empty(capacity, dtype='datetime64[s]'),
+            **{field: np.empty(capacity, dtype=np.int64 if field == 'volume' else np.float64) for field in OHLCV_FIELDS}
+        }
+        self._start = 0
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def window_start(self):
+        """Oldest buffered bar time, or None when empty"""
+        return self._columns['datetime'][self._start] if self._size else None
+    
+    def snapshot(self):
+        """Buffered bars as ordered column copies"""
+        positions = (self._start + np.arange(self._size)) % self.capacity
+        return {key: values[positions] for key, values in self._columns.items()}
+    
+    def _append(self, arrays):
+        n = len(arrays['datetime'])
+        if n >= self.capacity:
+            self._rewrite({key: values[-self.capacity:] for key, values in arrays.items()})
+            self.complete = False
+            return
+        
+        positions = (self._start + self._size + np.arange(n)) % self.capacity
+        for key, values in self._columns.items():
+            values[positions] = arrays[key]
+        overflow = max(self._size + n - self.capacity, 0)
+        if overflow:
+            self.complete = False
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+    
+    def _rewrite(self, arrays):
+        n = len(arrays['datetime'])
+        for key, values in self._columns.items():
+            values[:n] = arrays[key]
+        self._start = 0
+        self._size = n
+    
+    def extend(self, arrays):
+        """Add bars (ascending), replacing buffered bars with the same timestamp"""
+        if len(arrays['datetime']) == 0:
+            return
+        
+        if self._size == 0 or arrays['datetime'][0] > self._columns['datetime'][(self._start + self._size - 1) % self.capacity]:
+            self._append(arrays)
+            return
+        
+        # Overlapping update: merge, letting the newer bar win on equal timestamps
+        current = self.snapshot()
+        merged = {key: np.concatenate((current[key], arrays[key])) for key in COLUMNS}
+        order = np.argsort(merged['datetime'], kind='stable')
+        merged = {key: values[order] for key, values in merged.items()}
+        keep = np.append(merged['datetime'][1:] != merged['datetime'][:-1], True)
+        merged = {key: values[keep] for key, values in merged.items()}
+        
+        if len(merged['datetime']) > self.capacity:
+            merged = {key: values[-self.capacity:] for key, values in merged.items()}
+            self.complete = False
+        self._rewrite(merged)
+
+class HotWindowStore:
+    """In-memory ring buffers of the latest stored bars per (symbol, exchange, kind)
+    
+    A buffer is only ever created from a database read (at startup or on the
+    first read that misses it), so it holds every stored bar from its window
+    start onward; committed ingests then keep it current. Ingests for keys
+    without a buffer are not buffered, since the buffer would lack the rows
+    already stored. Reads whose range starts inside a buffer's window are
+    answered without touching the database. At most ``max_buffers`` buffers
+    are kept; the least recently used is dropped first.
+    """
+    
+    def __init__(self, capacity: int, max_buffers: int = 256):
+        self.capacity = capacity
+        self._buffers = LRUCache(max_buffers)
+        # Ingest count per key, so a fill racing a commit is discarded rather than installed stale
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def fill(self, db: Session, symbol: str, exchange: str, kind: str):
+        """Load the latest stored bars of a key into a fresh buffer; None if an ingest raced the read"""
+        key = (symbol, exchange, kind)
+        with self._lock:
+            generation = self._generations.get(key, 0)
+        rows = db.execute(_latest_bars_query(symbol, exchange, kind, self.capacity)).all()
+        buffer = RingBuffer(self.capacity, complete=len(rows) < self.capacity)
+        buffer.extend(rows_to_arrays(rows[::-1]))
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return None
+            self._buffers.put(key, buffer)
+        return buffer
+    
+    def ingest(self, symbol: str, exchange: str, interval: str, arrays):
+        """Apply committed bars to the matching buffer, if one has been filled"""
+        key = (symbol, exchange, buffer_kind(interval))
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                buffer.extend(arrays)
+    
+    def read(self, symbol: str, exchange: str, interval: str, start_date, end_date, db: Session = None):
+        """Stored bars of the interval's kind between two dates (inclusive), or None
+        
+        None means the buffer does not cover the range and the caller must read
+        the database. With ``db``, a key without a buffer is filled first.
+        """
+        key = (symbol, exchange, buffer_kind(interval))
+        with self._lock:
+            buffer = self._buffers.get(key)
+        if buffer is None and db is not None:
+            buffer = self.fill(db, *key)
+        
+        start = np.datetime64(datetime.combine(start_date, time.min), 's')
+        end = np.datetime64(datetime.combine(end_date + timedelta(days=1), time.min), 's')
+        with self._lock:
+            # The buffer may have been replaced or dropped since it was looked up
+            if buffer is None or self._buffers.get(key) is not buffer:
+                self.misses += 1
+                return None
+            window_start = buffer.window_start()
+            covered = buffer.complete or (window_start is not None and start >= window_start)
+            if not covered:
+                self.misses += 1
+                return None
+            self.hits += 1
+            arrays = buffer.snapshot()
+        
+        lo, hi = np.searchsorted(arrays['datetime'], [start, end])
+        return {key: values[lo:hi] for key, values in arrays.items()}
+    
+    def invalidate(self, symbol: str = None, exchange: str = None, kind: str = None):
+        with self._lock:
+            self._buffers.invalidate(
+                lambda key: (symbol is None or key[0] == symbol) and (exchange is None or key[1] == exchange) and (kind is None or key[2] == kind)
+            )
+    
+    def stats(self):
+        with self._lock:
+            buffers = self._buffers.values()
+            return {
+                'buffers': len(buffers),
+                'max_buffers': self._buffers.max_entries,
+                'capacity': self.capacity,
+                'bars': sum(len(buffer) for buffer in buffers),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+def _latest_bars_query(symbol: str, exchange: str, interval: str, limit: int):
+    query = select(
+        StockData.date, StockData.time,
+        StockData.open, StockData.high, StockData.low, StockData.close, StockData.volume
+    ).where(
+        StockData.symbol == symbol,
+        StockData.exchange == exchange,
+        stored_bar_filter(interval)
+    )
+    return query.order_by(StockData.date.desc(), StockData.time.desc()).limit(limit)
+
+def warm_hot_window(db: Session, store: 'HotWindowStore' = None):
+    """Fill buffers for every watchlist symbol that has stored bars of each kind
+    
+    Works from stock_data itself, so databases created before coverage was
+    tracked are warmed too.
+    """
+    store = store or hot_window
+    pairs = db.execute(select(WatchlistItem.symbol, WatchlistItem.exchange).distinct()).all()
+    
+    filled = 0
+    for symbol, exchange in pairs:
+        for kind in BUFFER_KINDS:
+            buffer = store.fill(db, symbol, exchange, kind)
+            if buffer is not None and len(buffer) == 0:
+                # Nothing stored of this kind; leave it to be filled on first read
+                store.invalidate(symbol, exchange, kind)
+            elif buffer is not None:
+                filled += 1
+    
+    logging.info(f"Hot window warmed with {filled} buffers")
+    return filled
+
+def stage_hot_window(db: Session, symbol: str, exchange: str, interval: str, rows):
+    """Queue upserted rows for the hot window; they are applied when the session commits"""
+    # Later rows win on duplicate timestamps, as with the upsert itself
+    bars = {
+        (row['date'], row['time']): (row['date'], row['time'], row['open'], row['high'], row['low'], row['close'], row['volume'])
+        for row in rows
+    }
+    arrays = rows_to_arrays([bars[key] for key in sorted(bars)])
+    db.info.setdefault('hot_window_pending', []).append(((symbol, exchange, interval), arrays))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_hot_window(session):
+    for (symbol, exchange, interval), arrays in session.info.pop('hot_window_pending', []):
+        hot_window.ingest(symbol, exchange, interval, arrays)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_hot_window(session):
+    session.info.pop('hot_window_pending', None)
+
+# Create global hot window instance
+hot_window = HotWindowStore(settings.HOT_WINDOW_SIZE, settings.HOT_WINDOW_BUFFERS)
@@ -0,0 +1,96 @@
+import threading
+import numpy as np
+from app.core.config import settings
+from app.utils.lru import LRUCache
+from app.utils.indicators import calculate_ema, calculate_rsi, extend_ema, extend_rsi
+
+# indicator name -> (full computation, incremental extension)
+INDICATOR_FUNCTIONS = {
+    'ema': (calculate_ema, extend_ema),
+    'rsi': (calculate_rsi, extend_rsi)
+}
+
+class _Entry:
+    __slots__ = ('version', 'times', 'close', 'values')
+    
+    def __init__(self, version, times, close, values):
+        self.version = version
+        self.times = times
+        self.close = close
+        self.values = values
+
+class IndicatorCache:
+    """LRU cache of indicator series keyed by (symbol, exchange, interval, indicator, params)
+    
+    Each entry remembers the bars it was computed from. When the data version
+    changes, only the bars from the first changed or appended one onward are
+    recomputed; a moved series start falls back to a full computation.
+    Returned arrays are shared with the cache and must not be mutated.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = LRUCache(max_entries)
+        # Guards the counters; the LRU locks its own entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+    
+    def get(self, symbol, exchange, interval, indicator, period, times, close, version=None):
+        """Get indicator values aligned with ``times``/``close``, computing only what changed"""
+        calculate, extend = INDICATOR_FUNCTIONS[indicator]
+        key = (symbol, exchange, interval, indicator, (period,))
+        n = len(close)
+        
+        entry = self._entries.get(key)
+        
+        outcome = 'misses'
+        values = None
+        if entry is not None and n and len(entry.times) and entry.times[0] == times[0]:
+            cached = len(entry.times)
+            if version is not None and entry.version == version and cached == n and entry.times[-1] == times[-1]:
+                with self._lock:
+                    self.hits += 1
+                return entry.values
+            
+            # First bar that differs from the cached series (or the first new bar)
+            overlap = min(cached, n)
+            changed = np.flatnonzero(
+                (entry.times[:overlap] != times[:overlap]) | (entry.close[:overlap] != close[:overlap])
+            )
+            start = int(changed[0]) if len(changed) else overlap
+            if start == n and cached == n:
+                values = entry.values
+                outcome = 'hits'
+            elif start > 0:
+                values = extend(entry.values[:start], close, start, period)
+                outcome = 'extensions'
+        
+        if values is None:
+            values = calculate(close, period)
+        
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        self._entries.put(key, _Entry(version, np.array(times), np.array(close, dtype=float), values))
+        return values
+    
+    def invalidate(self, symbol=None, exchange=None):
+        """Drop cached series, optionally only those of one symbol/exchange"""
+        self._entries.invalidate(
+            lambda key: (symbol is None or key[0] == symbol) and (exchange is None or key[1] == exchange)
+        )
+    
+    def stats(self):
+        entries = self._entries.stats()['entries']
+        with self._lock:
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'extensions': self.extensions,
+                'misses': self.misses
+            }
+
+# Create global indicator cache instance
+indicator_cache = IndicatorCache(settings.INDICATOR_CACHE_SIZE)
@@ -0,0 +1,260 @@
+import numpy as np
+import pandas as pd
+from app.utils.indicators import calculate_rsi
+
+# name -> {'function', 'params', 'outputs', 'pane', 'description'}
+INDICATORS = {}
+
+def register_indicator(name, params=None, outputs=('value',), pane='overlay', description=''):
+    """Register an indicator function taking (ctx, **params) and returning {output: array}"""
+    def decorator(func):
+        INDICATORS[name] = {
+            'function': func,
+            'params': params or {},
+            'outputs': list(outputs),
+            'pane': pane,
+            'description': description
+        }
+        return func
+    return decorator
+
+class IndicatorContext:
+    """Bar columns plus a memo of intermediates shared between indicators"""
+    
+    def __init__(self, columns, datetimes=None):
+        self.open = np.asarray(columns['open'], dtype=float)
+        self.high = np.asarray(columns['high'], dtype=float)
+        self.low = np.asarray(columns['low'], dtype=float)
+        self.close = np.asarray(columns['close'], dtype=float)
+        self.volume = np.asarray(columns['volume'], dtype=float)
+        self.datetimes = datetimes
+        self._memo = {}
+    
+    def cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+    
+    def series(self, name):
+        return self.cached(('series', name), lambda: pd.Series(getattr(self, name)))
+    
+    def sma(self, period, source='close'):
+        return self.cached(('sma', source, period), lambda: self.series(source).rolling(window=period).mean().to_numpy())
+    
+    def std(self, period, source='close'):
+        return self.cached(('std', source, period), lambda: self.series(source).rolling(window=period).std().to_numpy())
+    
+    def ema(self, period, source='close'):
+        return self.cached(('ema', source, period), lambda: self.series(source).ewm(span=period, adjust=False).mean().to_numpy())
+    
+    def rolling_max(self, period, source='high'):
+        return self.cached(('max', source, period), lambda: self.series(source).rolling(window=period).max().to_numpy())
+    
+    def rolling_min(self, period, source='low'):
+        return self.cached(('min', source, period), lambda: self.series(source).rolling(window=period).min().to_numpy())
+    
+    def true_range(self):
+        def compute():
+            prev_close = np.concatenate(([np.nan], self.close[:-1]))
+            ranges = np.vstack((self.high - self.low, np.abs(self.high - prev_close), np.abs(self.low - prev_close)))
+            return np.nanmax(ranges, axis=0)
+        return self.cached(('true_range',), compute)
+    
+    def atr(self, period):
+        # Wilder's smoothing of the true range
+        return self.cached(
+            ('atr', period),
+            lambda: pd.Series(self.true_range()).ewm(alpha=1 / period, adjust=False, min_periods=period).mean().to_numpy()
+        )
+    
+    def hl2(self):
+        return self.cached(('hl2',), lambda: (self.high + self.low) / 2)
+    
+    def typical_price(self):
+        return self.cached(('typical_price',), lambda: (self.high + self.low + self.close) / 3)
+    
+    def session_starts(self):
+        """Boolean mask marking the first bar of each trading day"""
+        def compute():
+            if self.datetimes is None or len(self.datetimes) == 0:
+                return np.zeros(len(self.close), dtype=bool)
+            days = np.asarray(self.datetimes).astype('datetime64[D]')
+            return np.concatenate(([True], days[1:] != days[:-1]))
+        return self.cached(('session_starts',), compute)
+
+@register_indicator('sma', {'period': 20}, description='Simple Moving Average')
+def _sma(ctx, period):
+    return {'value': ctx.sma(period)}
+
+@register_indicator('ema', {'period': 20}, description='Exponential Moving Average')
+def _ema(ctx, period):
+    return {'value': ctx.ema(period)}
+
+@register_indicator('rsi', {'period': 14}, pane='separate', description='Relative Strength Index')
+def _rsi(ctx, period):
+    return {'value': calculate_rsi(ctx.close, period)}
+
+@register_indicator(
+    'macd', {'fast': 12, 'slow': 26, 'signal': 9},
+    outputs=('macd', 'signal', 'histogram'), pane='separate',
+    description='Moving Average Convergence Divergence'
+)
+def _macd(ctx, fast, slow, signal):
+    macd = ctx.ema(fast) - ctx.ema(slow)
+    signal_line = pd.Series(macd).ewm(span=signal, adjust=False).mean().to_numpy()
+    return {'macd': macd, 'signal': signal_line, 'histogram': macd - signal_line}
+
+@register_indicator(
+    'bollinger', {'period': 20, 'num_std': 2.0},
+    outputs=('upper', 'middle', 'lower'), description='Bollinger Bands'
+)
+def _bollinger(ctx, period, num_std):
+    middle = ctx.sma(period)
+    std = ctx.std(period)
+    return {'upper': middle + std * num_std, 'middle': middle, 'lower': middle - std * num_std}
+
+@register_indicator('atr', {'period': 14}, pane='separate', description='Average True Range')
+def _atr(ctx, period):
+    return {'value': ctx.atr(period)}
+
+@register_indicator('vwap', description='Volume Weighted Average Price (resets each session)')
+def _vwap(ctx):
+    session = np.cumsum(ctx.session_starts())
+    price_volume = pd.Series(ctx.typical_price() * ctx.volume).groupby(session).cumsum().to_numpy()
+    volume = pd.Series(ctx.volume).groupby(session).cumsum().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = np.where(volume > 0, price_volume / volume, np.nan)
+    return {'value': vwap}
+
+@register_indicator(
+    'supertrend', {'period': 10, 'multiplier': 3.0},
+    outputs=('value', 'direction'), description='Supertrend'
+)
+def _supertrend(ctx, period, multiplier):
+    atr = ctx.atr(period)
+    hl2 = ctx.hl2()
+    close = ctx.close
+    basic_upper = hl2 + multiplier * atr
+    basic_lower = hl2 - multiplier * atr
+    
+    n = len(close)
+    upper = basic_upper.copy()
+    lower = basic_lower.copy()
+    value = np.full(n, np.nan)
+    direction = np.full(n, np.nan)
+    
+    # Band ratcheting depends on the previous bar, so this part is a tight loop over arrays
+    start = int(np.argmax(~np.isnan(atr))) if np.any(~np.isnan(atr)) else n
+    if start < n:
+        direction[start] = 1.0
+        value[start] = lower[start]
+    for i in range(start + 1, n):
+        if basic_upper[i] < upper[i - 1] or close[i - 1] > upper[i - 1]:
+            upper[i] = basic_upper[i]
+        else:
+            upper[i] = upper[i - 1]
+        if basic_lower[i] > lower[i - 1] or close[i - 1] < lower[i - 1]:
+            lower[i] = basic_lower[i]
+        else:
+            lower[i] = lower[i - 1]
+        
+        if direction[i - 1] == 1.0:
+            direction[i] = -1.0 if close[i] < lower[i] else 1.0
+        else:
+            direction[i] = 1.0 if close[i] > upper[i] else -1.0
+        value[i] = lower[i] if direction[i] == 1.0 else upper[i]
+    
+    return {'value': value, 'direction': direction}
+
+@register_indicator('obv', pane='separate', description='On-Balance Volume')
+def _obv(ctx):
+    direction = np.sign(np.diff(ctx.close, prepend=ctx.close[:1]))
+    return {'value': np.cumsum(direction * ctx.volume)}
+
+@register_indicator(
+    'stochastic', {'k_period': 14, 'd_period': 3},
+    outputs=('k', 'd'), pane='separate', description='Stochastic Oscillator'
+)
+def _stochastic(ctx, k_period, d_period):
+    highest = ctx.rolling_max(k_period, 'high')
+    lowest = ctx.rolling_min(k_period, 'low')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(highest > lowest, 100 * (ctx.close - lowest) / (highest - lowest), np.nan)
+    d = pd.Series(k).rolling(window=d_period).mean().to_numpy()
+    return {'k': k, 'd': d}
+
+def parse_indicator_specs(spec_string: str):
+    """Parse 'ema:20,macd:12:26:9,vwap' into [(id, name, params)]
+    
+    Positional values map onto the registered parameters in order; omitted
+    values use the defaults. Non-positive or non-finite values, and fractional
+    values for integer parameters, raise ValueError.
+    """
+    specs = []
+    for item in filter(None, (part.strip() for part in spec_string.split(','))):
+        name, *values = item.split(':')
+        name = name.lower()
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        
+        defaults = INDICATORS[name]['params']
+        if len(values) > len(defaults):
+            raise ValueError(f"Too many parameters for {name}: expected at most {len(defaults)}")
+        
+        params = dict(defaults)
+        for (param, default), value in zip(defaults.items(), values):
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid {name} {param}: {value}")
+            if isinstance(default, int):
+                # Integer parameters (periods) must not be silently truncated
+                if not number.is_integer():
+                    raise ValueError(f"{name} {param} must be a whole number, got {value}")
+                number = int(number)
+            params[param] = number
+            # Periods, band widths and multipliers are all meaningful only when positive
+            if not (params[param] > 0 and np.isfinite(params[param])):
+                raise ValueError(f"{name} {param} must be a positive number, got {value}")
+        
+        indicator_id = '_'.join([name] + [str(value) for value in params.values()])
+        specs.append((indicator_id, name, params))
+    return specs
+
+def warmup_bars(specs, factor: int = 3):
+    """Bars of history needed before a page so its indicators are continuous
+    
+    Rolling indicators need their longest window; recursive ones (EMA, RSI, ATR)
+    converge to within a fraction of a percent after a few multiples of it.
+    """
+    longest = 1
+    for _, _, params in specs:
+        for value in params.values():
+            if isinstance(value, int):
+                longest = max(longest, value)
+    return longest * factor
+
+def compute_indicators(columns, specs, datetimes=None):
+    """Compute every requested indicator over one shared context
+    
+    Intermediates such as moving averages, the true range and ATR are computed
+    once and reused by all indicators that need them.
+    """
+    ctx = IndicatorContext(columns, datetimes)
+    results = {}
+    for indicator_id, name, params in specs:
+        if indicator_id in results:
+            continue
+        results[indicator_id] = INDICATORS[name]['function'](ctx, **params)
+    return results
+
+def describe_indicators():
+    """Registry description for clients"""
+    return {
+        name: {
+            'params': definition['params'],
+            'outputs': definition['outputs'],
+            'pane': definition['pane'],
+            'description': definition['description']
+        } for name, definition in INDICATORS.items()
+    }
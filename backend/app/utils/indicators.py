@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+def calculate_ema(close, period=20):
+    """Calculate Exponential Moving Average (NaN where undefined)"""
+    close = np.asarray(close, dtype=float)
+    if len(close) < period:
+        return np.full(len(close), np.nan)
+    
+    return pd.Series(close).ewm(span=period, adjust=False).mean().to_numpy()
+
+def calculate_rsi(close, period=14):
+    """Calculate Relative Strength Index (NaN where undefined)"""
+    close = np.asarray(close, dtype=float)
+    if len(close) < period + 1:
+        return np.full(len(close), np.nan)
+    
+    delta = pd.Series(close).diff()
+    
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    
+    avg_gain = gain.rolling(window=period).mean().fillna(0)
+    avg_loss = loss.rolling(window=period).mean().fillna(0)
+    
+    rs = avg_gain / avg_loss.replace(0, np.finfo(float).eps)
+    rsi = 100 - (100 / (1 + rs))
+    
+    return rsi.to_numpy()
+
+def extend_ema(values, close, start, period=20):
+    """Recompute EMA from index ``start`` onward, reusing values[:start]
+    
+    The recursion only needs the previous EMA value, so the tail is seeded with
+    values[start - 1] and run through the same adjust=False smoothing.
+    """
+    close = np.asarray(close, dtype=float)
+    if start <= 0 or len(close) < period or np.isnan(values[start - 1]):
+        return calculate_ema(close, period)
+    
+    seeded = np.concatenate(([values[start - 1]], close[start:]))
+    tail = pd.Series(seeded).ewm(span=period, adjust=False).mean().to_numpy()[1:]
+    return np.concatenate((values[:start], tail))
+
+def extend_rsi(values, close, start, period=14):
+    """Recompute RSI from index ``start`` onward, reusing values[:start]
+    
+    RSI at bar i only depends on closes i-period..i, so only that trailing
+    slice is recomputed.
+    """
+    close = np.asarray(close, dtype=float)
+    if start < period + 1 or len(close) < period + 1:
+        return calculate_rsi(close, period)
+    
+    tail = calculate_rsi(close[start - period:], period)[period:]
+    return np.concatenate((values[:start], tail))
@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session
+from app.database.database import dialect_insert
+from app.models.stock_data import StockData
+from app.utils.coverage import record_coverage
+from app.utils.data_version import bump_data_version
+from app.utils.hot_window import stage_hot_window
+
+UPSERT_BATCH_SIZE = 5000
+
+def _upsert_statement(db: Session):
+    """Build an INSERT ... ON CONFLICT DO UPDATE statement for stock_data"""
+    stmt = dialect_insert(db, StockData.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['symbol', 'exchange', 'date', 'time'],
+        set_={
+            'open': stmt.excluded.open,
+            'high': stmt.excluded.high,
+            'low': stmt.excluded.low,
+            'close': stmt.excluded.close,
+            'volume': stmt.excluded.volume
+        }
+    )
+
+def bulk_upsert_bars(db: Session, symbol: str, exchange: str, interval: str, rows):
+    """Upsert OHLCV rows in batches, update the coverage index and bump the data version (caller commits)
+    
+    The rows are also applied to the in-memory hot window once the session commits.
+    
+    Each row is a dict with date, time, open, high, low, close and volume.
+    """
+    if not rows:
+        return 0
+    
+    stmt = _upsert_statement(db)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        db.execute(stmt, [
+            {
+                'symbol': symbol,
+                'exchange': exchange,
+                'date': row['date'],
+                'time': row['time'],
+                'open': row['open'],
+                'high': row['high'],
+                'low': row['low'],
+                'close': row['close'],
+                'volume': row['volume']
+            } for row in batch
+        ])
+    
+    record_coverage(db, symbol, exchange, interval, {row['date'] for row in rows})
+    bump_data_version(db, symbol, exchange, interval)
+    stage_hot_window(db, symbol, exchange, interval, rows)
+    
+    return len(rows)
+
+def store_historical_data(db: Session, symbol: str, exchange: str, interval: str, historical_data):
+    """Store fetched OHLCV rows through the bulk upsert path (caller commits)"""
+    return bulk_upsert_bars(db, symbol, exchange, interval, historical_data)
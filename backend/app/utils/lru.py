@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by entry count and optional total size
+    
+    ``sizeof`` maps a value to its cost (e.g. bytes); when ``max_size`` is set,
+    the oldest entries are evicted until the total cost fits.
+    """
+    
+    def __init__(self, max_entries: int = 128, max_size: int = None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 0)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+    
+    def put(self, key, value):
+        cost = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if self.max_size is not None and cost > self.max_size:
+                return
+            self._entries[key] = (value, cost)
+            self._size += cost
+            while len(self._entries) > self.max_entries or (
+                self.max_size is not None and self._size > self.max_size
+            ):
+                self._size -= self._entries.popitem(last=False)[1][1]
+    
+    def values(self):
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+    
+    def invalidate(self, predicate=None):
+        """Drop all entries, or only those whose key matches ``predicate``"""
+        with self._lock:
+            for key in list(self._entries):
+                if predicate is None or predicate(key):
+                    self._size -= self._entries.pop(key)[1]
+    
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'size': self._size,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
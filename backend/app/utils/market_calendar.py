@@ -0,0 +1,60 @@
+from datetime import date, datetime, time
+import numpy as np
+import pytz
+from app.core.config import settings
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# NSE cash market session (IST)
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+
+def market_holidays():
+    """Configured exchange holidays as numpy datetime64[D]"""
+    return np.array(settings.MARKET_HOLIDAYS, dtype='datetime64[D]')
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def is_trading_day(day):
+    """Check whether a date is a trading day (weekday and not a holiday)"""
+    return bool(np.is_busday(np.datetime64(_as_date(day), 'D'), holidays=market_holidays()))
+
+def roll_forward(day):
+    """Get the given date if it is a trading day, else the next trading day"""
+    day = np.datetime64(_as_date(day), 'D')
+    return np.busday_offset(day, 0, roll='forward', holidays=market_holidays()).astype(date)
+
+def roll_backward(day):
+    """Get the given date if it is a trading day, else the previous trading day"""
+    day = np.datetime64(_as_date(day), 'D')
+    return np.busday_offset(day, 0, roll='backward', holidays=market_holidays()).astype(date)
+
+def next_trading_day(day):
+    """Get the first trading day strictly after the given date"""
+    day = np.datetime64(_as_date(day), 'D')
+    return np.busday_offset(day + 1, 0, roll='forward', holidays=market_holidays()).astype(date)
+
+def previous_trading_day(day):
+    """Get the last trading day strictly before the given date"""
+    day = np.datetime64(_as_date(day), 'D')
+    return np.busday_offset(day - 1, 0, roll='backward', holidays=market_holidays()).astype(date)
+
+def count_trading_days(start, end):
+    """Count trading days in the inclusive range [start, end]"""
+    start = np.datetime64(_as_date(start), 'D')
+    end = np.datetime64(_as_date(end), 'D')
+    if end < start:
+        return 0
+    return int(np.busday_count(start, end + 1, holidays=market_holidays()))
+
+def trading_days(start, end):
+    """List trading days in the inclusive range [start, end]"""
+    start = np.datetime64(_as_date(start), 'D')
+    end = np.datetime64(_as_date(end), 'D')
+    if end < start:
+        return []
+    days = np.arange(start, end + 1, dtype='datetime64[D]')
+    return days[np.is_busday(days, holidays=market_holidays())].astype(date).tolist()
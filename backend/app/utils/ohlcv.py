@@ -0,0 +1,147 @@
+from datetime import date, datetime, time, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+from app.models.stock_data import StockData
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Intervals whose bars are stored at midnight; all others are stored at their session time
+DAILY_STORED_INTERVALS = ('D', '1d', 'W', '1w')
+
+# Proleptic Gregorian ordinal of 1970-01-01, the datetime64 epoch
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def stored_bar_filter(interval: str):
+    """Clause selecting the stored rows of an interval's kind (daily or intraday)"""
+    return StockData.time == time.min if interval in DAILY_STORED_INTERVALS else StockData.time != time.min
+
+def ohlcv_query(symbol: str, exchange: str, start_date: date, end_date: date, interval: str = None):
+    """Core select of bar tuples for a symbol ordered by date and time
+    
+    With ``interval`` only stored rows of its kind are selected; without it,
+    daily and intraday rows are returned together.
+    """
+    query = select(
+        StockData.date, StockData.time,
+        StockData.open, StockData.high, StockData.low, StockData.close, StockData.volume
+    ).where(
+        StockData.symbol == symbol,
+        StockData.exchange == exchange,
+        StockData.date >= start_date,
+        StockData.date <= end_date
+    )
+    if interval is not None:
+        query = query.where(stored_bar_filter(interval))
+    return query.order_by(StockData.date, StockData.time)
+
+def rows_to_arrays(rows):
+    """Convert (date, time, open, high, low, close, volume) tuples into NumPy columns
+    
+    Returns a dict with naive 'datetime' (datetime64[s]) plus one array per OHLCV field.
+    Columns after the first seven are ignored.
+    """
+    n = len(rows)
+    if n == 0:
+        return {
+            'datetime': np.array([], dtype='datetime64[s]'),
+            **{field: np.array([], dtype=np.int64 if field == 'volume' else np.float64) for field in OHLCV_FIELDS}
+        }
+    
+    dates, times, opens, highs, lows, closes, volumes = list(zip(*rows))[:7]
+    # Day ordinals convert far faster than building datetime64 from date objects
+    days = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=n) - EPOCH_ORDINAL
+    seconds = np.fromiter(
+        (t.hour * 3600 + t.minute * 60 + t.second if t is not None else 0 for t in times),
+        dtype=np.int64, count=n
+    )
+    datetimes = (days * 86400 + seconds).astype('datetime64[s]')
+    
+    return {
+        'datetime': datetimes,
+        'open': np.array(opens, dtype=np.float64),
+        'high': np.array(highs, dtype=np.float64),
+        'low': np.array(lows, dtype=np.float64),
+        'close': np.array(closes, dtype=np.float64),
+        'volume': np.array(volumes, dtype=np.int64)
+    }
+
+def load_ohlcv_arrays(db: Session, symbol: str, exchange: str, start_date: date, end_date: date, interval: str = None):
+    """Load bars as NumPy columns without hydrating ORM objects"""
+    # Executed on the connection so rows skip the ORM result layer
+    rows = db.connection().execute(ohlcv_query(symbol, exchange, start_date, end_date, interval)).all()
+    return rows_to_arrays(rows)
+
+def load_ohlcv_multi(db: Session, symbols, exchange: str, start_date: date, end_date: date):
+    """Load bars for several symbols with one IN-filtered range query
+    
+    Returns {symbol: columns} in the order of ``symbols``; symbols without
+    stored bars get empty columns.
+    """
+    query = select(
+        StockData.date, StockData.time,
+        StockData.open, StockData.high, StockData.low, StockData.close, StockData.volume,
+        StockData.symbol
+    ).where(
+        StockData.symbol.in_(symbols),
+        StockData.exchange == exchange,
+        StockData.date >= start_date,
+        StockData.date <= end_date
+    ).order_by(StockData.symbol, StockData.date, StockData.time)
+    rows = db.connection().execute(query).all()
+    arrays = rows_to_arrays(rows)
+    
+    # Rows are ordered by symbol, so each symbol is one contiguous slice
+    series = {symbol: rows_to_arrays([]) for symbol in symbols}
+    row_symbols = np.array([row[7] for row in rows], dtype=object)
+    starts = np.flatnonzero(np.concatenate(([True], row_symbols[1:] != row_symbols[:-1]))) if len(rows) else []
+    ends = np.append(starts[1:], len(rows))
+    for start, end in zip(starts, ends):
+        series[row_symbols[start]] = {key: values[start:end] for key, values in arrays.items()}
+    return series
+
+def load_ohlcv_before(db: Session, symbol: str, exchange: str, before: datetime, limit: int):
+    """Load up to ``limit`` bars strictly older than ``before`` as ascending NumPy columns
+    
+    Walks the (symbol, exchange, date, time) unique index backwards, so each page
+    is one small indexed query regardless of how much history is stored.
+    """
+    query = select(
+        StockData.date, StockData.time,
+        StockData.open, StockData.high, StockData.low, StockData.close, StockData.volume
+    ).where(
+        StockData.symbol == symbol,
+        StockData.exchange == exchange,
+        or_(
+            StockData.date < before.date(),
+            and_(StockData.date == before.date(), StockData.time < before.time())
+        )
+    ).order_by(StockData.date.desc(), StockData.time.desc()).limit(limit)
+    rows = db.execute(query).all()
+    return rows_to_arrays(rows[::-1])
+
+def epoch_seconds(datetimes: np.ndarray, tz=None) -> np.ndarray:
+    """Convert naive wall-clock datetime64 values to Unix seconds
+    
+    Values are interpreted in ``tz`` (a tz name or tzinfo), or the server's local
+    timezone when omitted, matching ``datetime.timestamp()`` on naive datetimes.
+    """
+    if len(datetimes) == 0:
+        return np.array([], dtype=np.int64)
+    
+    if tz is not None:
+        index = pd.DatetimeIndex(datetimes).tz_localize(
+            tz, ambiguous=np.ones(len(datetimes), dtype=bool), nonexistent='shift_forward'
+        )
+        return index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[s]').astype(np.int64)
+    
+    # UTC offsets only change on hour boundaries, so resolve one offset per distinct hour
+    naive = datetimes.astype('datetime64[s]').astype(np.int64)
+    hours, inverse = np.unique(naive // 3600, return_inverse=True)
+    epoch = datetime(1970, 1, 1)
+    offsets = np.array(
+        [int((epoch + timedelta(hours=int(h))).timestamp()) - int(h) * 3600 for h in hours],
+        dtype=np.int64
+    )
+    return naive + offsets[inverse]
@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Dict, Any
+
+LOT_METHODS = ('fifo', 'average')
+
+class PositionLedger:
+    """Per-symbol open lots with running quantity, cost and realized PnL
+    
+    With 'fifo' a sell closes the oldest lots first; with 'average' it is
+    matched against the average cost of everything held. Each buy adds one lot
+    and each lot is consumed at most once, so fills are amortised O(1), and
+    unrealized PnL at any price is O(1) from the running cost. PnL is on fill
+    prices; commissions are accounted for in cash separately.
+    """
+    
+    def __init__(self, method: str = 'fifo'):
+        if method not in LOT_METHODS:
+            raise ValueError(f"Unknown lot method: {method}; choose one of {', '.join(LOT_METHODS)}")
+        self.method = method
+        self._lots = {}
+        self._quantity = {}
+        self._cost = {}
+        self._realized = {}
+        self.total_realized = 0.0
+    
+    def quantity(self, symbol: str) -> int:
+        return self._quantity.get(symbol, 0)
+    
+    def avg_price(self, symbol: str) -> float:
+        quantity = self._quantity.get(symbol, 0)
+        return self._cost[symbol] / quantity if quantity else 0.0
+    
+    def realized(self, symbol: str) -> float:
+        return self._realized.get(symbol, 0.0)
+    
+    def unrealized(self, symbol: str, price: float) -> float:
+        quantity = self._quantity.get(symbol, 0)
+        return quantity * price - self._cost[symbol] if quantity else 0.0
+    
+    def symbols(self):
+        return list(self._quantity)
+    
+    def open_cost(self) -> float:
+        """Cost basis of everything still held"""
+        return sum(self._cost.values())
+    
+    def buy(self, symbol: str, quantity: int, price: float):
+        if self.method == 'fifo':
+            self._lots.setdefault(symbol, deque()).append([quantity, price])
+        self._quantity[symbol] = self._quantity.get(symbol, 0) + quantity
+        self._cost[symbol] = self._cost.get(symbol, 0.0) + quantity * price
+    
+    def sell(self, symbol: str, quantity: int, price: float) -> float:
+        """Close ``quantity`` of a long position; returns the realized PnL of this sell"""
+        held = self._quantity.get(symbol, 0)
+        if quantity > held:
+            raise ValueError(f"Cannot sell {quantity} {symbol}; only {held} held")
+        
+        if self.method == 'fifo':
+            lots = self._lots[symbol]
+            remaining = quantity
+            cost = 0.0
+            while remaining:
+                lot = lots[0]
+                take = min(remaining, lot[0])
+                cost += take * lot[1]
+                lot[0] -= take
+                remaining -= take
+                if lot[0] == 0:
+                    lots.popleft()
+        else:
+            cost = self._cost[symbol] * quantity / held
+        
+        pnl = quantity * price - cost
+        self._quantity[symbol] = held - quantity
+        self._cost[symbol] = self._cost[symbol] - cost if held > quantity else 0.0
+        self._realized[symbol] = self._realized.get(symbol, 0.0) + pnl
+        self.total_realized += pnl
+        return pnl
+    
+    def snapshot(self, symbol: str, price: float, timestamp) -> Dict[str, Any]:
+        """Position row for the Position table, marked at ``price``"""
+        return {
+            'symbol': symbol,
+            'quantity': self.quantity(symbol),
+            'avg_price': self.avg_price(symbol),
+            'current_price': float(price),
+            'pnl': self.realized(symbol) + self.unrealized(symbol, price),
+            'timestamp': timestamp
+        }
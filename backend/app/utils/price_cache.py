@@ -0,0 +1,64 @@
+from datetime import datetime
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.utils.lru import LRUCache
+from app.utils.ohlcv import load_ohlcv_arrays, load_ohlcv_multi, OHLCV_FIELDS
+from app.utils.data_version import get_data_version, get_data_versions
+from app.utils.resample import load_resampled_bars
+
+def _price_key(symbol: str, exchange: str, interval, start_date, end_date, version: int):
+    return (symbol, exchange, interval, start_date, end_date, version)
+
+def load_price_arrays(db: Session, symbol: str, exchange: str, start_date: datetime, end_date: datetime, interval: str = None):
+    """Bars between two dates as NumPy columns, cached per data version
+    
+    ``interval`` None returns the stored rows as they are; otherwise bars are
+    resampled to it (through the resampled-bar cache, which shares this key
+    layout). Misses are read with a Core select straight into arrays. Cached
+    arrays are shared between callers and must not be modified.
+    """
+    version, _ = get_data_version(db, symbol, exchange)
+    if interval is not None:
+        return load_resampled_bars(db, symbol, exchange, interval, start_date.date(), end_date.date(), version)
+    
+    key = _price_key(symbol, exchange, interval, start_date.date(), end_date.date(), version)
+    arrays = price_cache.get(key)
+    if arrays is None:
+        arrays = load_ohlcv_arrays(db, symbol, exchange, start_date.date(), end_date.date())
+        price_cache.put(key, arrays)
+    return arrays
+
+def load_price_arrays_multi(db: Session, symbols, exchange: str, start_date: datetime, end_date: datetime):
+    """Stored bars of several symbols; cache misses share one IN query"""
+    versions = get_data_versions(db, symbols, exchange)
+    series = {}
+    missing = []
+    for symbol in symbols:
+        arrays = price_cache.get(_price_key(symbol, exchange, None, start_date.date(), end_date.date(), versions[symbol]))
+        if arrays is None:
+            missing.append(symbol)
+        else:
+            series[symbol] = arrays
+    
+    if missing:
+        for symbol, arrays in load_ohlcv_multi(db, missing, exchange, start_date.date(), end_date.date()).items():
+            price_cache.put(_price_key(symbol, exchange, None, start_date.date(), end_date.date(), versions[symbol]), arrays)
+            series[symbol] = arrays
+    return {symbol: series[symbol] for symbol in symbols}
+
+def price_frame(arrays) -> pd.DataFrame:
+    """Backtest DataFrame (timestamp index, OHLCV columns) over cached columns"""
+    if len(arrays['datetime']) == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(
+        {field: arrays[field] for field in OHLCV_FIELDS},
+        index=pd.DatetimeIndex(arrays['datetime'], name='timestamp')
+    )
+
+# Create global price cache instance
+price_cache = LRUCache(
+    max_entries=settings.PRICE_CACHE_SIZE,
+    max_size=settings.PRICE_CACHE_MB * 1024 * 1024,
+    sizeof=lambda arrays: sum(values.nbytes for values in arrays.values())
+)
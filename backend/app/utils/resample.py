@@ -0,0 +1,151 @@
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.utils.lru import LRUCache
+from app.utils.ohlcv import load_ohlcv_arrays, load_ohlcv_before
+from app.utils.market_calendar import MARKET_OPEN
+from app.utils.hot_window import hot_window
+
+INTRADAY_MINUTES = {
+    '1m': 1, '3m': 3, '5m': 5, '10m': 10, '15m': 15, '30m': 30, '1h': 60
+}
+DAILY_INTERVALS = ('D', '1d')
+WEEKLY_INTERVALS = ('W', '1w')
+
+SESSION_OPEN_SECONDS = MARKET_OPEN.hour * 3600 + MARKET_OPEN.minute * 60
+
+def _select(arrays, mask):
+    return {key: values[mask] for key, values in arrays.items()}
+
+def _aggregate(arrays, keys):
+    """Aggregate sorted bars sharing a bucket key into one OHLCV bar per key"""
+    if len(keys) == 0:
+        return arrays
+    
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:] - 1, len(keys) - 1)
+    return {
+        'datetime': keys[starts],
+        'open': arrays['open'][starts],
+        'high': np.maximum.reduceat(arrays['high'], starts),
+        'low': np.minimum.reduceat(arrays['low'], starts),
+        'close': arrays['close'][ends],
+        'volume': np.add.reduceat(arrays['volume'], starts)
+    }
+
+def _concat(first, second):
+    return {key: np.concatenate((first[key], second[key])) for key in first}
+
+def _merge(first, second):
+    order = np.argsort(np.concatenate((first['datetime'], second['datetime'])), kind='stable')
+    return {key: np.concatenate((first[key], second[key]))[order] for key in first}
+
+def resample_bars(arrays, interval: str):
+    """Resample stored bars to ``interval`` with IST session-anchored buckets
+    
+    Daily bars are stored at midnight and intraday bars at their IST wall-clock
+    time, both in stock_data. Intraday targets aggregate intraday bars into
+    buckets anchored at the 09:15 session open, so buckets never span sessions.
+    Daily/weekly targets use stored daily bars and fill days that only have
+    intraday bars by aggregating them; weeks start on Monday.
+    """
+    datetimes = arrays['datetime']
+    if len(datetimes) == 0:
+        return arrays
+    
+    days = datetimes.astype('datetime64[D]')
+    seconds_of_day = (datetimes - days.astype('datetime64[s]')).astype(np.int64)
+    is_daily = seconds_of_day == 0
+    
+    if interval in INTRADAY_MINUTES:
+        intraday = ~is_daily
+        if not intraday.any():
+            # Only daily history is stored; it cannot be split into intraday bars
+            return arrays
+        
+        step = INTRADAY_MINUTES[interval] * 60
+        offset = seconds_of_day[intraday] - SESSION_OPEN_SECONDS
+        buckets = days[intraday].astype('datetime64[s]') + (
+            SESSION_OPEN_SECONDS + np.floor_divide(offset, step) * step
+        ).astype('timedelta64[s]')
+        return _aggregate(_select(arrays, intraday), buckets)
+    
+    if interval in DAILY_INTERVALS or interval in WEEKLY_INTERVALS:
+        daily = _select(arrays, is_daily)
+        if not is_daily.all():
+            from_intraday = _aggregate(_select(arrays, ~is_daily), days[~is_daily].astype('datetime64[s]'))
+            missing = ~np.isin(from_intraday['datetime'], daily['datetime'])
+            daily = _merge(daily, _select(from_intraday, missing))
+        
+        if interval in WEEKLY_INTERVALS:
+            daily_days = daily['datetime'].astype('datetime64[D]')
+            # 1970-01-01 was a Thursday, so Monday-based weekday is (days + 3) % 7
+            mondays = daily_days - ((daily_days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+            daily = _aggregate(daily, mondays.astype('datetime64[s]'))
+        return daily
+    
+    return arrays
+
+# Create global resampled-bar cache instance
+resample_cache = LRUCache(
+    max_entries=settings.RESAMPLE_CACHE_SIZE,
+    sizeof=lambda arrays: sum(values.nbytes for values in arrays.values())
+)
+
+def load_hot_bars(db: Session, symbol: str, exchange: str, start_date, end_date):
+    """All stored bars of a range from the hot window, or None unless it covers them
+    
+    resample_bars draws on both daily and intraday rows, so both buffers must
+    cover the range for the result to match a database read.
+    """
+    daily = hot_window.read(symbol, exchange, 'D', start_date, end_date, db)
+    if daily is None:
+        return None
+    intraday = hot_window.read(symbol, exchange, '1m', start_date, end_date, db)
+    if intraday is None:
+        return None
+    return _merge(daily, intraday)
+
+def load_resampled_bars(db: Session, symbol: str, exchange: str, interval: str, start_date, end_date, version=None):
+    """Load bars for a date range resampled to ``interval``, cached per data version
+    
+    Ranges inside the hot window are read from memory instead of the database.
+    """
+    key = (symbol, exchange, interval, start_date, end_date, version)
+    arrays = resample_cache.get(key) if version is not None else None
+    if arrays is None:
+        stored = load_hot_bars(db, symbol, exchange, start_date, end_date)
+        if stored is None:
+            stored = load_ohlcv_arrays(db, symbol, exchange, start_date, end_date)
+        arrays = resample_bars(stored, interval)
+        if version is not None:
+            resample_cache.put(key, arrays)
+    return arrays
+
+def load_resampled_page(db: Session, symbol: str, exchange: str, interval: str, before, count: int):
+    """Load the ``count`` resampled bars immediately older than ``before`` (naive IST)
+    
+    Stored rows are fetched backwards in indexed batches until enough complete
+    bars exist. The oldest bucket of a batch may be cut by the batch boundary, so
+    it is only kept once the start of history has been reached. Returns
+    (arrays, has_more).
+    """
+    batch_size = max(count, 100)
+    stored = None
+    cursor = before
+    while True:
+        batch = load_ohlcv_before(db, symbol, exchange, cursor, batch_size)
+        stored = batch if stored is None else _concat(batch, stored)
+        exhausted = len(batch['datetime']) < batch_size
+        
+        bars = resample_bars(stored, interval)
+        first_complete = 0 if exhausted else 1
+        if exhausted or len(bars['datetime']) - first_complete >= count:
+            break
+        
+        cursor = stored['datetime'][0].astype(object)
+        batch_size *= 2
+    
+    start = max(len(bars['datetime']) - count, first_complete)
+    page = {key: values[start:] for key, values in bars.items()}
+    return page, start > 0
@@ -7,7 +7,11 @@ import logging
 from app.database.database import SessionLocal
 from app.models.watchlist import WatchlistItem
 from app.models.scheduler_job import SchedulerJob
-from app.utils.data_fetcher import fetch_historical_data
+from app.core.config import settings
+from app.utils.data_fetcher import fetch_historical_data, fetch_realtime_quotes
+from app.utils.ingest import store_historical_data
+from app.utils.bar_builder import bar_builder
+from app.utils.market_calendar import MARKET_OPEN, MARKET_CLOSE, is_trading_day
 
 IST = pytz.timezone('Asia/Kolkata')
 
@@ -26,6 +30,9 @@ class SchedulerManager:
                 logging.info("Scheduler already running")
             
             self._load_persisted_jobs()
+            
+            if settings.LIVE_BARS_ENABLED:
+                self.add_live_bar_jobs(settings.LIVE_BARS_POLL_SECONDS, settings.LIVE_BARS_FLUSH_SECONDS)
                 
         except Exception as e:
             logging.error(f"Failed to start scheduler: {str(e)}")
@@ -150,6 +157,67 @@ class SchedulerManager:
         job_id = job_id or "pre_market_download"
         return self.add_daily_download_job("08:30", job_id=job_id, persist=True)
     
+    def add_live_bar_jobs(self, poll_seconds=5, flush_seconds=60):
+        """Poll watchlist quotes into live 1m bars and flush completed bars periodically"""
+        self.scheduler.add_job(
+            func=self._poll_live_quotes,
+            trigger=IntervalTrigger(seconds=poll_seconds),
+            id='live_bars_poll',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            name=f"Live quote poll every {poll_seconds} seconds"
+        )
+        self.scheduler.add_job(
+            func=self._flush_live_bars,
+            trigger=IntervalTrigger(seconds=flush_seconds),
+            id='live_bars_flush',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            name=f"Live bar flush every {flush_seconds} seconds"
+        )
+        
+        for job_id, seconds in (('live_bars_poll', poll_seconds), ('live_bars_flush', flush_seconds)):
+            self.jobs[job_id] = {'type': 'live_bars', 'seconds': seconds, 'interval': '1m'}
+        
+        logging.info(f"Added live bar jobs: poll every {poll_seconds}s, flush every {flush_seconds}s")
+    
+    def _poll_live_quotes(self):
+        """Feed one round of watchlist quotes to the live bar builder"""
+        now = datetime.now(IST)
+        if not is_trading_day(now.date()) or not MARKET_OPEN <= now.time() < MARKET_CLOSE:
+            return
+        
+        try:
+            db = SessionLocal()
+            try:
+                watchlist_items = db.query(WatchlistItem).all()
+            finally:
+                db.close()
+            
+            if watchlist_items:
+                quotes = fetch_realtime_quotes(
+                    [item.symbol for item in watchlist_items],
+                    [item.exchange for item in watchlist_items]
+                )
+                bar_builder.update(quotes, now)
+        
+        except Exception as e:
+            logging.error(f"Error polling live quotes: {str(e)}")
+    
+    def _flush_live_bars(self, include_open=False):
+        """Write completed live bars (and with include_open, the in-progress ones) to the database"""
+        db = SessionLocal()
+        try:
+            written = bar_builder.flush(db, include_open=include_open)
+            if written:
+                logging.info(f"Flushed {written} live bars")
+        except Exception as e:
+            logging.error(f"Error flushing live bars: {str(e)}")
+        finally:
+            db.close()
+    
     def _execute_download(self, symbols=None, exchanges=None, interval='D'):
         """Execute the actual download process"""
         try:
@@ -177,11 +245,13 @@ class SchedulerManager:
                         historical_data = fetch_historical_data(symbol, start_date, end_date, interval=interval, exchange=exchange)
                         
                         if historical_data:
-                            # Store data logic here
+                            store_historical_data(db, symbol, exchange, interval, historical_data)
+                            db.commit()
                             success_count += 1
                             logging.info(f"Successfully downloaded data for {symbol}")
                         
                     except Exception as e:
+                        db.rollback()
                         failed_count += 1
                         logging.error(f"Failed to download data for {symbol}: {str(e)}")
                 
@@ -337,6 +407,10 @@ class SchedulerManager:
         if self.scheduler.running:
             self.scheduler.shutdown()
             logging.info("Scheduler shut down")
+        
+        if settings.LIVE_BARS_ENABLED:
+            # Also write the current minute's partial bar rather than losing it
+            self._flush_live_bars(include_open=True)
 
 # Create global scheduler instance
 scheduler_manager = SchedulerManager()
\ No newline at end of file
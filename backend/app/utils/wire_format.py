@@ -0,0 +1,85 @@
+import json
+import logging
+import numpy as np
+from fastapi import Request, Response
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    PYARROW_AVAILABLE = False
+    logging.warning(f'PyArrow import error, Arrow responses disabled: {str(e)}')
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError as e:
+    MSGPACK_AVAILABLE = False
+    logging.warning(f'MessagePack import error, MessagePack responses disabled: {str(e)}')
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+def negotiate_format(request: Request) -> str:
+    """Pick 'arrow', 'msgpack' or 'json' from the Accept header (JSON is the default)"""
+    accept = request.headers.get('accept', '') if request is not None else ''
+    preferences = []
+    for position, item in enumerate(accept.split(',')):
+        media_type, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences.append((-quality, position, media_type.strip().lower()))
+    
+    for quality, _, media_type in sorted(preferences):
+        if quality == 0:
+            break
+        if media_type == ARROW_MEDIA_TYPE and PYARROW_AVAILABLE:
+            return 'arrow'
+        if media_type in MSGPACK_MEDIA_TYPES and MSGPACK_AVAILABLE:
+            return 'msgpack'
+        if media_type in ('application/json', '*/*', 'application/*'):
+            return 'json'
+    return 'json'
+
+def _arrow_body(columns, metadata):
+    table = pa.table(
+        {name: pa.array(np.asarray(values)) for name, values in columns.items()},
+        metadata={'historify': json.dumps(metadata, default=str)}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _msgpack_body(columns, metadata):
+    # Columns travel as raw little-endian buffers so clients can view them as typed arrays
+    packed_columns = {}
+    for name, values in columns.items():
+        values = np.ascontiguousarray(values)
+        if values.dtype == object:
+            packed_columns[name] = values.tolist()
+        else:
+            values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+            packed_columns[name] = {
+                'dtype': values.dtype.str,
+                'length': len(values),
+                'data': values.tobytes()
+            }
+    return msgpack.packb({**metadata, 'columns': packed_columns}, default=str)
+
+def columnar_response(columns, wire_format: str, metadata=None, headers=None) -> Response:
+    """Encode aligned NumPy columns as an Arrow IPC stream or MessagePack map"""
+    metadata = metadata or {}
+    headers = {**(headers or {}), 'Vary': 'Accept'}
+    if wire_format == 'arrow':
+        return Response(_arrow_body(columns, metadata), media_type=ARROW_MEDIA_TYPE, headers=headers)
+    elif wire_format == 'msgpack':
+        return Response(_msgpack_body(columns, metadata), media_type=MSGPACK_MEDIA_TYPES[0], headers=headers)
+    else:
+        raise ValueError(f"Unsupported wire format: {wire_format}")
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from app.utils.backtest_sweep import _frame_to_block, _block_to_frame, map_shared, evaluate_parameters, PRICE_COLUMNS
+
+def _bars(n):
+    close = np.linspace(100.0, 120.0, n) + np.sin(np.arange(n))
+    return pd.DataFrame(
+        {'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1000.0},
+        index=pd.date_range('2024-01-01 09:15', periods=n, freq='min', name='timestamp')
+    )
+
+def test_block_frame_is_a_view_of_the_shared_block():
+    data = _bars(50)
+    block = _frame_to_block(data)
+    frame = _block_to_frame(block)
+    
+    assert (frame.index == data.index).all()
+    np.testing.assert_array_equal(frame.to_numpy(), data[list(PRICE_COLUMNS)].to_numpy())
+    assert np.shares_memory(frame.index.values, block)
+    for column in PRICE_COLUMNS:
+        assert np.shares_memory(frame[column].to_numpy(), block)
+
+def test_strategy_runs_leave_the_block_untouched():
+    data = _bars(200)
+    block = _frame_to_block(data)
+    before = block.copy()
+    frame = _block_to_frame(block)
+    
+    evaluate_parameters(frame, 'sma_crossover', {'short_window': 5, 'long_window': 20}, 100000)
+    np.testing.assert_array_equal(block, before)
+
+def test_parallel_map_matches_in_process():
+    data = _bars(300)
+    tasks = [('sma_crossover', {'short_window': short, 'long_window': 30}, 100000) for short in (5, 10, 15)]
+    assert map_shared(data, evaluate_parameters, tasks, max_workers=2) == map_shared(data, evaluate_parameters, tasks, max_workers=1)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.backtest_engine import BacktestEngine
+
+def _per_bar_execute_signals(self, data, buy_signals, sell_signals, quantity=100):
+    """The per-bar loop _execute_signals replaced, kept as the reference"""
+    close = data['close'].to_numpy(dtype=np.float64)
+    values, cash, position_values = [], [], []
+    position = 0
+    for i, timestamp in enumerate(data.index):
+        if i >= self.warmup_bars:
+            if buy_signals[i] and position == 0:
+                position = self._execute_buy_order(timestamp, close[i], quantity)
+            elif sell_signals[i] and position > 0:
+                self._execute_sell_order(timestamp, close[i], position)
+                position = 0
+        position_value = position * close[i] if position > 0 else 0
+        values.append(self.cash + position_value)
+        cash.append(self.cash)
+        position_values.append(position_value)
+    
+    self.portfolio_value = {
+        'timestamp': data.index.values.astype('datetime64[s]')[self.warmup_bars:],
+        'value': np.asarray(values[self.warmup_bars:], dtype=np.float64),
+        'cash': np.asarray(cash[self.warmup_bars:], dtype=np.float64),
+        'position_value': np.asarray(position_values[self.warmup_bars:], dtype=np.float64)
+    }
+    if len(data):
+        self._snapshot_open_positions({self.symbol: (data.index[-1], close[-1])})
+
+def _random_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame(
+        {'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close, 'volume': 1000.0},
+        index=pd.date_range('2024-01-01 09:15', periods=n, freq='min', name='timestamp')
+    )
+
+def _run(data, buy, sell, capital, warmup_bars, execute=None):
+    engine = BacktestEngine(None)
+    engine.generate_signals = lambda frame, name, params: (buy, sell)
+    if execute is not None:
+        engine._execute_signals = execute.__get__(engine)
+    results = engine.run_strategy(data, 'fixed_signals', {}, capital, warmup_bars=warmup_bars)
+    return engine, results
+
+@pytest.mark.parametrize('seed, capital, warmup_bars', [
+    (1, 100000, 0),
+    (2, 100000, 50),
+    # Barely enough for the first buy, so later buys after losses are skipped
+    (3, 10011, 0),
+    (4, 10011, 25),
+])
+def test_matches_per_bar_loop(seed, capital, warmup_bars):
+    data = _random_bars(500, seed)
+    rng = np.random.default_rng(seed + 100)
+    # Dense signals give runs of consecutive and same-bar buy/sell signals
+    buy = rng.random(len(data)) < 0.3
+    sell = rng.random(len(data)) < 0.3
+    buy[[10, 11, 12]] = True
+    sell[[13, 14]] = True
+    
+    vectorized, results = _run(data, buy, sell, capital, warmup_bars)
+    reference, expected = _run(data, buy, sell, capital, warmup_bars, _per_bar_execute_signals)
+    
+    assert vectorized.orders == reference.orders
+    assert vectorized.trades == reference.trades
+    assert vectorized.position_snapshots == reference.position_snapshots
+    for field in ('timestamp', 'value', 'cash', 'position_value'):
+        np.testing.assert_array_equal(vectorized.portfolio_value[field], reference.portfolio_value[field])
+    assert results == expected
+    assert len(vectorized.trades) > 4
+    # Warm-up signals never trade
+    assert all(trade['timestamp'] >= data.index[warmup_bars] for trade in vectorized.trades)
+
+def test_skipped_buy_keeps_looking_for_a_buy():
+    data = _random_bars(6, 0)
+    data['close'] = [100.0, 200.0, 100.0, 100.0, 100.0, 100.0]
+    buy = np.array([False, True, True, False, False, False])
+    sell = np.array([False, False, False, True, False, False])
+    # 100 shares at 200 is out of reach, so the buy fills on bar 2 instead
+    engine, _ = _run(data, buy, sell, 15000, 0)
+    assert [(trade['side'], trade['timestamp']) for trade in engine.trades] == [
+        ('BUY', data.index[2]), ('SELL', data.index[3])
+    ]
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.backtest_engine import BacktestEngine
+from app.utils.execution import (
+    bar_events, find_fill, order_price, check_execution, SLIPPAGE_MODELS, COMMISSION_MODELS
+)
+
+def _bars(opens, highs, lows, closes):
+    return pd.DataFrame(
+        {'open': opens, 'high': highs, 'low': lows, 'close': closes, 'volume': 1000.0},
+        index=pd.date_range('2024-01-01 09:15', periods=len(opens), freq='min', name='timestamp')
+    )
+
+def _run(data, buy_bars, sell_bars, execution):
+    """Run the event-driven engine with fixed signal bars"""
+    buy = np.zeros(len(data), dtype=bool)
+    sell = np.zeros(len(data), dtype=bool)
+    buy[buy_bars] = True
+    sell[sell_bars] = True
+    engine = BacktestEngine(None)
+    engine.generate_signals = lambda frame, name, params: (buy, sell)
+    engine.run_strategy(data, 'fixed_signals', {}, 100000, execution=execution)
+    return engine
+
+# Flat at 100 with one bar that dips to 95 and one that gaps up to open at 111
+FLAT = _bars(
+    [100, 100, 100, 100, 111, 100],
+    [101, 101, 101, 101, 112, 101],
+    [99, 99, 95, 99, 110, 99],
+    [100, 100, 100, 100, 111, 100]
+)
+
+def test_limit_never_touched():
+    events = bar_events(FLAT)
+    assert find_fill(events, 'limit', 'BUY', 90.0, 1, len(FLAT)) == (None, None)
+    assert find_fill(events, 'limit', 'SELL', 120.0, 1, len(FLAT)) == (None, None)
+    
+    engine = _run(FLAT, [0], [], {'order_type': 'limit', 'limit_offset': 0.1})
+    assert engine.trades == []
+    assert [order['status'] for order in engine.orders] == ['PENDING']
+    assert engine.orders[0]['filled_quantity'] == 0
+
+def test_limit_fills_at_limit_when_touched():
+    events = bar_events(FLAT)
+    assert find_fill(events, 'limit', 'BUY', 96.0, 1, len(FLAT)) == (2, 96.0)
+
+def test_stop_gap_through_fills_at_open():
+    events = bar_events(FLAT)
+    # The stop at 105 is never traded; bar 4 opens above it
+    assert find_fill(events, 'stop', 'BUY', 105.0, 1, len(FLAT)) == (4, 111.0)
+    # A sell stop gapped through downwards fills at the lower open
+    gap_down = _bars([100, 90], [101, 91], [99, 89], [100, 90])
+    assert find_fill(bar_events(gap_down), 'stop', 'SELL', 95.0, 1, 2) == (1, 90.0)
+    
+    engine = _run(FLAT, [0], [], {'order_type': 'stop', 'stop_offset': 0.05})
+    assert engine.orders[0]['price'] == pytest.approx(105.0)
+    assert engine.orders[0]['filled_price'] == pytest.approx(111.0)
+    assert engine.trades[0]['timestamp'] == FLAT.index[4]
+
+def test_order_expires_after_valid_bars():
+    # The limit at 95 would fill on bar 2, but the order only works on bar 1
+    engine = _run(FLAT, [0, 3], [], {'order_type': 'limit', 'limit_offset': 0.05, 'valid_bars': 1})
+    assert engine.orders[0]['status'] == 'CANCELLED'
+    assert engine.trades == []
+    # The signal on bar 3 places a new order after the first expired
+    assert len(engine.orders) == 2
+    
+    engine = _run(FLAT, [0], [], {'order_type': 'limit', 'limit_offset': 0.05, 'valid_bars': 2})
+    assert engine.orders[0]['status'] == 'FILLED'
+    assert engine.trades[0]['timestamp'] == FLAT.index[2]
+
+def test_market_fills_at_next_open():
+    engine = _run(FLAT, [3], [], {'order_type': 'market'})
+    assert engine.trades[0]['price'] == pytest.approx(111.0)
+    assert engine.trades[0]['timestamp'] == FLAT.index[4]
+
+def test_order_prices():
+    assert order_price('market', 'BUY', 100.0, 0.02, 0.03) is None
+    assert order_price('limit', 'BUY', 100.0, 0.02, 0.03) == pytest.approx(98.0)
+    assert order_price('limit', 'SELL', 100.0, 0.02, 0.03) == pytest.approx(102.0)
+    assert order_price('stop', 'BUY', 100.0, 0.02, 0.03) == pytest.approx(103.0)
+    assert order_price('stop', 'SELL', 100.0, 0.02, 0.03) == pytest.approx(97.0)
+
+@pytest.mark.parametrize('model, params, buy, sell', [
+    ('none', {}, 100.0, 100.0),
+    ('bps', {'bps': 10}, 100.1, 99.9),
+    ('fixed', {'amount': 0.25}, 100.25, 99.75),
+])
+def test_slippage_models(model, params, buy, sell):
+    assert SLIPPAGE_MODELS[model]('BUY', 100.0, 10, params) == pytest.approx(buy)
+    assert SLIPPAGE_MODELS[model]('SELL', 100.0, 10, params) == pytest.approx(sell)
+
+def test_slippage_is_capped_by_bar_range():
+    # Market buy on bar 1 opens at 100 with a high of 101; 5% slippage would pay 105
+    engine = _run(FLAT, [0], [], {'order_type': 'market', 'slippage': {'model': 'bps', 'bps': 500}})
+    assert engine.trades[0]['price'] == pytest.approx(101.0)
+
+def test_limit_fills_pay_no_slippage():
+    engine = _run(FLAT, [0], [], {'order_type': 'limit', 'limit_offset': 0.04, 'slippage': {'model': 'fixed', 'amount': 1}})
+    assert engine.trades[0]['price'] == pytest.approx(96.0)
+
+@pytest.mark.parametrize('model, params, expected', [
+    ('percent', {'rate': 0.002}, 20.0),
+    ('per_share', {'rate': 0.05}, 5.0),
+    ('per_share', {'rate': 0.01, 'minimum': 3.0}, 3.0),
+    ('flat', {'amount': 7.5}, 7.5),
+])
+def test_commission_models(model, params, expected):
+    assert COMMISSION_MODELS[model](10000.0, 100, params) == pytest.approx(expected)
+    
+    # Charged on the engine's fills: market buy of 100 shares at 100
+    engine = _run(FLAT, [0], [], {'order_type': 'market', 'commission': {'model': model, **params}})
+    assert engine.trades[0]['commission'] == pytest.approx(expected)
+    assert engine.cash == pytest.approx(100000 - 100 * 100 - expected)
+
+def test_check_execution_rejects_unknown_settings():
+    for execution in (
+        {'order_type': 'trailing'},
+        {'slippage': {'model': 'random'}},
+        {'commission': {'model': 'tiered'}},
+        {'valid_bars': 0},
+    ):
+        with pytest.raises(ValueError):
+            check_execution(execution)
@@ -0,0 +1,73 @@
+import pytest
+from app.utils.position_ledger import PositionLedger
+
+def _three_lots(method):
+    ledger = PositionLedger(method)
+    ledger.buy('ABC', 10, 100.0)
+    ledger.buy('ABC', 10, 110.0)
+    ledger.buy('ABC', 10, 120.0)
+    return ledger
+
+def test_fifo_partial_sells_across_lots():
+    ledger = _three_lots('fifo')
+    
+    # Closes the whole first lot and half of the second
+    assert ledger.sell('ABC', 15, 130.0) == pytest.approx(15 * 130 - (10 * 100 + 5 * 110))
+    assert ledger.quantity('ABC') == 15
+    assert ledger.avg_price('ABC') == pytest.approx((5 * 110 + 10 * 120) / 15)
+    
+    # Rest of the second lot and part of the third
+    assert ledger.sell('ABC', 8, 100.0) == pytest.approx(8 * 100 - (5 * 110 + 3 * 120))
+    assert ledger.quantity('ABC') == 7
+    assert ledger.avg_price('ABC') == pytest.approx(120.0)
+    assert ledger.unrealized('ABC', 125.0) == pytest.approx(7 * 5)
+
+def test_fifo_and_average_realize_differently_on_same_fills():
+    fifo = _three_lots('fifo')
+    average = _three_lots('average')
+    
+    assert fifo.sell('ABC', 10, 115.0) == pytest.approx(10 * 15)
+    assert average.sell('ABC', 10, 115.0) == pytest.approx(10 * 5)
+    assert fifo.avg_price('ABC') == pytest.approx(115.0)
+    assert average.avg_price('ABC') == pytest.approx(110.0)
+    
+    # Once everything is sold both methods agree on the total
+    fifo.sell('ABC', 20, 115.0)
+    average.sell('ABC', 20, 115.0)
+    assert fifo.total_realized == pytest.approx(average.total_realized)
+    assert fifo.total_realized == pytest.approx(30 * 115 - (1000 + 1100 + 1200))
+
+def test_selling_more_than_held_raises():
+    ledger = PositionLedger('fifo')
+    ledger.buy('ABC', 5, 100.0)
+    with pytest.raises(ValueError):
+        ledger.sell('ABC', 6, 100.0)
+    with pytest.raises(ValueError):
+        ledger.sell('XYZ', 1, 100.0)
+    
+    # A rejected sell leaves the position untouched
+    assert ledger.quantity('ABC') == 5
+    assert ledger.realized('ABC') == 0.0
+
+@pytest.mark.parametrize('method', ['fifo', 'average'])
+def test_flat_position_has_zero_cost(method):
+    ledger = _three_lots(method)
+    ledger.sell('ABC', 30, 105.0)
+    
+    assert ledger.quantity('ABC') == 0
+    assert ledger.avg_price('ABC') == 0.0
+    assert ledger.unrealized('ABC', 200.0) == 0.0
+    assert ledger.open_cost() == 0.0
+    
+    snapshot = ledger.snapshot('ABC', 105.0, None)
+    assert snapshot['quantity'] == 0
+    assert snapshot['avg_price'] == 0.0
+    assert snapshot['pnl'] == pytest.approx(30 * 105 - 3300)
+    
+    # Re-entering after going flat starts a fresh cost basis
+    ledger.buy('ABC', 4, 90.0)
+    assert ledger.avg_price('ABC') == pytest.approx(90.0)
+
+def test_unknown_lot_method_rejected():
+    with pytest.raises(ValueError):
+        PositionLedger('lifo')
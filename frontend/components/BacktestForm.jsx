@@ -111,8 +111,16 @@ export default function BacktestForm({ onBacktestStart, onBacktestComplete }) {
         end_date: new Date(formData.end_date).toISOString()
       })
 
+      // Backtests run in a background queue; poll until the run finishes
+      const status = await waitForBacktest(response.data.id)
+      if (status.status !== 'completed') {
+        toast.error(status.error || `Backtest ${status.status}`)
+        return
+      }
+
+      const result = await axios.get(`/api/backtest/results/${response.data.id}`)
       toast.success('Backtest completed successfully!')
-      onBacktestComplete?.(response.data)
+      onBacktestComplete?.(result.data)
     } catch (error) {
       console.error('Backtest error:', error)
       toast.error(error.response?.data?.detail || 'Backtest failed')
@@ -121,6 +129,16 @@ export default function BacktestForm({ onBacktestStart, onBacktestComplete }) {
     }
   }
 
+  const waitForBacktest = async (backtestId) => {
+    while (true) {
+      const response = await axios.get(`/api/backtest/status/${backtestId}`)
+      if (!['pending', 'running'].includes(response.data.status)) {
+        return response.data
+      }
+      await new Promise(resolve => setTimeout(resolve, 1000))
+    }
+  }
+
   const selectedStrategy = strategies[formData.strategy_name]
 
   return (